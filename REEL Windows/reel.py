@@ -1,8 +1,18 @@
-import os, csv, re, sys, subprocess, warnings, requests, time
+import os, csv, re, sys, subprocess, warnings, requests, time, threading, queue, sqlite3, json, hashlib, shutil, contextlib, random, errno
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yt_dlp, spotipy, lyricsgenius
 from spotipy.oauth2 import SpotifyClientCredentials
 import spotipy.exceptions
-from mutagen.id3 import ID3, TIT2, TALB, TPE1, TPE2, TRCK, TPOS, TDRC, APIC, USLT, ID3NoHeaderError
+import yt_dlp.networking
+from mutagen.id3 import ID3, TIT2, TALB, TPE1, TPE2, TRCK, TPOS, TDRC, TSRC, TXXX, APIC, USLT, ID3NoHeaderError
+from mutagen.mp4 import MP4, MP4Cover, MP4FreeForm
+from mutagen.oggopus import OggOpus
+from mutagen.oggvorbis import OggVorbis
+from mutagen.flac import Picture
+import base64
 
 # Color support
 try:
@@ -28,6 +38,25 @@ DIRS = {}
 sp = None
 genius = None
 
+JOBS = 4  # Concurrent workers for batch downloads
+STAGE_JOBS = {}  # Per-stage worker overrides for the download pipeline, e.g. {"transcode": 8}
+
+CACHE_FILE = ".reel_cache.db"  # Lives in the library root
+CACHE_TTL_DAYS = 30
+CACHE_MAX_ENTRIES = 50000
+YT_CACHE_TTL_DAYS = 7  # YouTube search results go stale faster than Spotify metadata
+LYRICS_MISS_TTL_DAYS = 3  # Songs Genius doesn't have are searched again after this
+SPOTIFY_MISS_TTL_DAYS = 3  # Same for Spotify "no match" results (near misses, newly added tracks)
+ART_DIR = ".reel_art"  # Artwork spill folder in the library root
+ART_MEMORY_MB = 64
+ART_DISK_MB = 500
+OUTPUT_FORMAT = "mp3"  # "mp3" (VBR V0 encode) or "native" (YouTube's Opus/AAC stream, remuxed as-is)
+STREAM_ENCODE = False  # MP3 output: pipe the download into ffmpeg in the fetch stage, no source file on disk
+STAGING_DIR = ""  # Work folder for downloads in progress; empty means ".reel_staging" in the library root
+STAGING_STALE_HOURS = 24  # Staging files untouched this long are removed on startup
+SPOTIFY_RATE = 5  # Spotify Web API requests per second, shared by all workers
+PROMPT_LOCK = threading.Lock()  # Serialize interactive prompts raised from workers
+
 # ========================= HELPERS ===========================
 
 def clean_name(s):
@@ -45,8 +74,14 @@ class yt_logger:
     def error(self, msg): pass
     def info(self, msg): pass
 
+worker_local = threading.local()  # .shared: this thread is one of several batch workers running at once
+
+def shared_worker():
+    """True in pool and pipeline workers that run next to others"""
+    return getattr(worker_local, "shared", False)
+
 def progress_hook(d):
-    """Show download progress"""
+    """Show download progress (leave it out of shared_worker() downloads)"""
     if d['status'] == 'downloading':
         percent = d.get('_percent_str', '0%').strip()
         speed = d.get('_speed_str', 'N/A').strip()
@@ -55,6 +90,72 @@ def progress_hook(d):
     elif d['status'] == 'finished':
         print(f"\r{Fore.GREEN}[DOWNLOADED]{Style.RESET_ALL} Converting to MP3...                    ", end='', flush=True)
 
+def set_jobs(n):
+    """Set number of concurrent batch workers"""
+    global JOBS
+    try:
+        JOBS = max(1, int(n))
+    except (TypeError, ValueError):
+        pass
+
+def run_pool(func, items, on_error=None):
+    """Run func(i, item) for every item on a bounded worker pool.
+    
+    Results come back in input order. An exception in one item is turned
+    into a failure result for that item only.
+    """
+    jobs = max(1, min(JOBS, len(items)))
+    
+    def work(i, item):
+        # Progress lines from parallel workers would overwrite each other
+        worker_local.shared = jobs > 1
+        try:
+            return func(i, item)
+        except Exception as e:
+            print(f"\n{Fore.RED}[ERROR]{Style.RESET_ALL} {e}")
+            result = on_error(item) if on_error else {}
+            result.update({"success": False, "reason": f"Error: {e}"})
+            return result
+    
+    if jobs == 1:
+        return [work(i, item) for i, item in enumerate(items, 1)]
+    
+    results = [None] * len(items)
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        futures = {pool.submit(work, i, item): i - 1 for i, item in enumerate(items, 1)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    except KeyboardInterrupt:
+        # Drop what hasn't started instead of draining the whole queue on Ctrl+C
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return results
+
+def set_stage_jobs(spec):
+    """Set pipeline stage workers from 'stage=N,stage=N'"""
+    global STAGE_JOBS
+    jobs = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            name, n = part.split("=", 1)
+            if name.strip() in PIPELINE_STAGES and n.strip().isdigit() and int(n) > 0:
+                jobs[name.strip()] = int(n)
+    STAGE_JOBS = jobs
+
+def stage_jobs(name):
+    """Workers for a pipeline stage (transcoding defaults to CPU cores)"""
+    if name in STAGE_JOBS:
+        return STAGE_JOBS[name]
+    if name == "transcode":
+        return os.cpu_count() or 2
+    return JOBS
+
+def failed_results(results):
+    """Pick failed result dicts out of a batch result list"""
+    return [r for r in results if isinstance(r, dict) and not r.get("success")]
+
 def set_dirs(new_base=None):
     """Initialize directory structure"""
     global BASE, DIRS
@@ -75,6 +176,652 @@ def set_dirs(new_base=None):
 
 set_dirs()
 
+# =========================== HTTP ============================
+
+HTTP_CONNECTIONS = 8     # Open connections kept per host
+HTTP_TIMEOUT = (5, 20)   # Connect, read (seconds)
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that applies HTTP_TIMEOUT when a call sets none"""
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = HTTP_TIMEOUT
+        return super().send(request, **kwargs)
+
+# One connection pool for every client: keep-alive, per-host limit, retries on 5xx
+# (429s are left to the API's RateLimiter so every worker backs off together)
+HTTP_ADAPTER = PooledAdapter(
+    pool_connections=32,
+    pool_maxsize=HTTP_CONNECTIONS,
+    pool_block=True,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=("GET", "HEAD", "POST"), respect_retry_after_header=True,
+                      raise_on_status=False)
+)
+
+def pooled(session):
+    """Route a requests.Session through the shared pool"""
+    session.mount("https://", HTTP_ADAPTER)
+    session.mount("http://", HTTP_ADAPTER)
+    return session
+
+HTTP = pooled(requests.Session())
+HTTP.headers["User-Agent"] = "REEL"
+
+class RateLimiter:
+    """Token bucket shared by every call to one API.
+    
+    acquire() blocks until a request may go out. pause() (a 429 with
+    Retry-After) holds back all callers, not only the one that got it.
+    Counters cover the current batch until report().
+    """
+    
+    def __init__(self, name, rate, burst=None):
+        self.name = name
+        self.lock = threading.Lock()
+        self.set_rate(rate, burst)
+        self.paused_until = 0
+        self.requests = self.throttled = 0
+        self.waited = 0.0
+    
+    def set_rate(self, rate, burst=None):
+        with self.lock:
+            self.rate = max(0.1, float(rate))
+            self.burst = burst or max(1, int(self.rate * 2))
+            self.tokens = self.burst
+            self.updated = time.monotonic()
+    
+    def acquire(self):
+        start = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self.requests += 1
+                        self.waited += now - start
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+    
+    def pause(self, seconds):
+        with self.lock:
+            self.throttled += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+    
+    def report(self):
+        """Print and reset the request counters"""
+        with self.lock:
+            used, throttled, waited = self.requests, self.throttled, self.waited
+            self.requests = self.throttled = 0
+            self.waited = 0.0
+        if used:
+            print(f"{Fore.CYAN}[{self.name.upper()}]{Style.RESET_ALL} {used} API requests | "
+                  f"rate limited: {throttled} | waiting: {waited:.1f}s")
+
+class LimitedSession(requests.Session):
+    """Pooled session paced by a RateLimiter; 429s are retried after Retry-After"""
+    
+    def __init__(self, limiter, attempts=5, max_wait=120):
+        super().__init__()
+        pooled(self)
+        self.limiter = limiter
+        self.attempts = attempts
+        self.max_wait = max_wait  # Longer bans are returned as errors
+    
+    def request(self, method, url, *args, **kwargs):
+        for attempt in range(self.attempts):
+            self.limiter.acquire()
+            response = super().request(method, url, *args, **kwargs)
+            if response.status_code != 429:
+                return response
+            
+            retry_after = response.headers.get("Retry-After", "")
+            wait = int(retry_after) + 1 if retry_after.isdigit() else 2 ** attempt
+            if wait > self.max_wait:
+                return response
+            print(f"{Fore.YELLOW}[RATE LIMIT]{Style.RESET_ALL} {self.limiter.name}: waiting {wait}s")
+            self.limiter.pause(wait)
+        return response
+
+SPOTIFY_LIMIT = RateLimiter("Spotify", SPOTIFY_RATE)
+
+# ========================== CACHE ============================
+
+MISS = object()  # Cache.get() result when there is no live entry
+
+def norm_key(*parts):
+    """Normalized cache key: lowercase, single spaces"""
+    return "|".join(" ".join(str(p).lower().split()) for p in parts)
+
+class Cache:
+    """Persistent JSON key/value store in SQLite under the library root.
+    
+    Entries expire after their TTL; past max_entries rows the least
+    recently used ones are evicted. Hits only note their use time in
+    memory; those are written in batches, not one commit per hit.
+    """
+    TOUCH_BATCH = 200  # Hits noted before their use times are written
+    
+    def __init__(self, table, ttl_days=None, max_entries=None):
+        self.table = table
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+        self.db = None
+        self.path = None
+        self.touched = {}  # key -> last use, not yet written
+    
+    def _conn(self):
+        path = os.path.join(BASE, CACHE_FILE)
+        if self.db is None or self.path != path:
+            if self.db is not None:
+                self.db.close()
+            self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")  # A crash can only lose the last few cache writes
+            self.touched = {}
+            self.db.execute(f"CREATE TABLE IF NOT EXISTS {self.table} "
+                            "(key TEXT PRIMARY KEY, value TEXT, expires REAL, used REAL)")
+            self.db.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_used ON {self.table} (used)")
+            self.path = path
+        return self.db
+    
+    def get(self, key):
+        """Cached value for key, or MISS"""
+        now = time.time()
+        with self.lock:
+            try:
+                db = self._conn()
+                row = db.execute(f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                if row and row[1] > now:
+                    self.touched[key] = now
+                    if len(self.touched) >= self.TOUCH_BATCH:
+                        self._write_touched(db)
+                        db.commit()
+                    self.hits += 1
+                    return json.loads(row[0])
+            except sqlite3.Error:
+                pass
+            self.misses += 1
+            return MISS
+    
+    def _write_touched(self, db):
+        db.executemany(f"UPDATE {self.table} SET used = ? WHERE key = ?",
+                       [(used, key) for key, used in self.touched.items()])
+        self.touched = {}
+    
+    def set(self, key, value, ttl_days=None):
+        """Store value (anything JSON serializable, including None)"""
+        now = time.time()
+        ttl = ttl_days if ttl_days is not None else (self.ttl_days if self.ttl_days is not None else CACHE_TTL_DAYS)
+        limit = self.max_entries or CACHE_MAX_ENTRIES
+        with self.lock:
+            try:
+                db = self._conn()
+                db.execute(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)",
+                           (key, json.dumps(value), now + ttl * 86400, now))
+                self._write_touched(db)  # Eviction below goes by use time
+                count = db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+                if count > limit:
+                    db.execute(f"DELETE FROM {self.table} WHERE key IN "
+                               f"(SELECT key FROM {self.table} ORDER BY used LIMIT ?)", (count - limit,))
+                db.commit()
+            except sqlite3.Error:
+                pass
+    
+    def clear(self):
+        with self.lock:
+            try:
+                self._conn().execute(f"DELETE FROM {self.table}")
+                self.db.commit()
+                self.touched = {}
+            except sqlite3.Error:
+                pass
+            self.hits = self.misses = 0
+    
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0
+        return f"{self.table}: {self.hits} hits, {self.misses} misses ({rate:.0%})"
+
+class ArtCache:
+    """Artwork bytes keyed by URL.
+    
+    Recent images stay in memory up to ART_MEMORY_MB; every image is also
+    written to ART_DIR (pruned to ART_DISK_MB) so later runs skip the CDN.
+    Workers asking for an image that is already being fetched wait for
+    that fetch and share its buffer.
+    """
+    def __init__(self):
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.disk = None  # path -> size of files in ART_DIR, least recently used first
+        self.disk_bytes = 0
+        self.disk_folder = None
+        self.inflight = {}
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+    
+    def _path(self, url):
+        return os.path.join(BASE, ART_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".img")
+    
+    def _remember(self, url, data):
+        with self.lock:
+            if url in self.memory:
+                return
+            self.memory[url] = data
+            self.memory_bytes += len(data)
+            while self.memory_bytes > ART_MEMORY_MB * 1024 * 1024 and len(self.memory) > 1:
+                _, old = self.memory.popitem(last=False)
+                self.memory_bytes -= len(old)
+    
+    def _spill(self, url, data):
+        path = self._path(url)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            return
+        
+        with self.lock:
+            self._index(os.path.dirname(path))
+            self.disk_bytes += len(data) - self.disk.pop(path, 0)
+            self.disk[path] = len(data)
+            evict = []
+            while self.disk_bytes > ART_DISK_MB * 1024 * 1024 and len(self.disk) > 1:
+                old, size = self.disk.popitem(last=False)
+                self.disk_bytes -= size
+                evict.append(old)
+        for old in evict:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    
+    def _index(self, folder):
+        """Scan the spill folder once (again only if the library moves); caller holds the lock"""
+        if self.disk is not None and self.disk_folder == folder:
+            return
+        self.disk, self.disk_bytes, self.disk_folder = OrderedDict(), 0, folder
+        try:
+            files = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".img")]
+            stats = sorted(((f, os.stat(f)) for f in files), key=lambda fs: fs[1].st_mtime)
+        except OSError:
+            return
+        for f, st in stats:
+            self.disk[f] = st.st_size
+            self.disk_bytes += st.st_size
+    
+    def _touch(self, path):
+        """Mark a spilled image as recently used"""
+        os.utime(path)
+        with self.lock:
+            self._index(os.path.dirname(path))
+            if path in self.disk:
+                self.disk.move_to_end(path)
+    
+    def get(self, url):
+        """Image bytes for url, or None if it can't be fetched"""
+        with self.lock:
+            if url in self.memory:
+                self.memory.move_to_end(url)
+                self.hits += 1
+                return self.memory[url]
+            waiting = self.inflight.get(url)
+            if waiting is None:
+                self.inflight[url] = threading.Event()
+        
+        if waiting is not None:
+            waiting.wait()
+            with self.lock:
+                if url in self.memory:
+                    self.hits += 1
+                    return self.memory[url]
+            return None
+        
+        data = None
+        try:
+            path = self._path(url)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    data = f.read()
+                self._touch(path)
+                with self.lock:
+                    self.hits += 1
+            else:
+                with self.lock:
+                    self.misses += 1
+                r = HTTP.get(url, timeout=10)
+                r.raise_for_status()
+                data = r.content
+                self._spill(url, data)
+            self._remember(url, data)
+        except (OSError, requests.RequestException):
+            data = None
+        finally:
+            with self.lock:
+                self.inflight.pop(url).set()
+        return data
+    
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            self.memory_bytes = 0
+            self.disk = None
+            self.hits = self.misses = 0
+        folder = os.path.join(BASE, ART_DIR)
+        if os.path.isdir(folder):
+            for f in os.listdir(folder):
+                os.remove(os.path.join(folder, f))
+    
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0
+        return f"artwork: {self.hits} hits, {self.misses} fetches ({rate:.0%})"
+
+META_CACHE = Cache("spotify_meta")
+YT_SEARCH_CACHE = Cache("youtube_search", ttl_days=YT_CACHE_TTL_DAYS)
+
+LYRICS_CACHE = Cache("lyrics")
+ART_CACHE = ArtCache()
+
+CACHES = [META_CACHE, YT_SEARCH_CACHE, LYRICS_CACHE, ART_CACHE]
+
+def print_cache_stats():
+    """Show hit/miss counters for caches used in this session"""
+    used = [c for c in CACHES if c.hits or c.misses]
+    if used:
+        print(f"{Fore.CYAN}[CACHE]{Style.RESET_ALL} " + " | ".join(c.summary() for c in used))
+
+# ========================= LIBRARY ===========================
+
+AUDIO_EXTS = (".mp3", ".m4a", ".opus", ".ogg")
+
+def youtube_id(url):
+    """Extract the video ID from a YouTube URL"""
+    m = re.search(r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/)([\w-]{11})', url or "")
+    return m.group(1) if m else None
+
+def read_index_tags(path):
+    """Index keys stored in a downloaded file's tags"""
+    tags = read_tags(path)
+    track, artist = tags.get("title"), tags.get("artist")
+    if not (track and artist):
+        # Files are named "Track - Artist.ext"
+        name = os.path.splitext(os.path.basename(path))[0]
+        track, _, artist = name.partition(" - ")
+    return {"spotify_id": tags.get("spotify_id"), "isrc": tags.get("isrc"),
+            "youtube_id": tags.get("youtube_id"), "name": norm_key(track, artist) if artist else None}
+
+def library_file(out_dir, base):
+    """Existing "base.<audio ext>" in out_dir, or None"""
+    for ext in AUDIO_EXTS:
+        path = os.path.join(out_dir, base + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+class LibraryIndex:
+    """Downloaded files by Spotify ID, ISRC, YouTube ID and track/artist.
+    
+    Built by scanning the library root, reading tags only for new or
+    changed files, and updated whenever a track is written. Lookups are
+    served from memory; the table in the cache DB keeps scans incremental.
+    """
+    KEYS = ("spotify_id", "isrc", "youtube_id", "name")
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.db = None
+        self.path = None
+        self.files = {}  # path -> (mtime, keys)
+        self.lookup = {}  # (key, value) -> path
+        self.scanned = False
+    
+    def _conn(self):
+        path = os.path.join(BASE, CACHE_FILE)
+        if self.db is None or self.path != path:
+            if self.db is not None:
+                self.db.close()
+            self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS library (path TEXT PRIMARY KEY, mtime REAL, "
+                            "spotify_id TEXT, isrc TEXT, youtube_id TEXT, name TEXT)")
+            self.path = path
+            self.files, self.lookup, self.scanned = {}, {}, False
+            for row in self.db.execute("SELECT path, mtime, spotify_id, isrc, youtube_id, name FROM library"):
+                self._remember(row[0], row[1], dict(zip(self.KEYS, row[2:])))
+        return self.db
+    
+    def _remember(self, path, mtime, keys):
+        self.files[path] = (mtime, keys)
+        for k in self.KEYS:
+            if keys.get(k):
+                self.lookup[(k, keys[k])] = path
+    
+    def _store(self, path, mtime, keys):
+        self._forget(path)
+        self._remember(path, mtime, keys)
+        self.db.execute("INSERT OR REPLACE INTO library VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, mtime) + tuple(keys.get(k) for k in self.KEYS))
+    
+    def _forget(self, path):
+        _, keys = self.files.pop(path, (None, {}))
+        for k in self.KEYS:
+            if keys.get(k) and self.lookup.get((k, keys[k])) == path:
+                del self.lookup[(k, keys[k])]
+        self.db.execute("DELETE FROM library WHERE path = ?", (path,))
+    
+    def scan(self):
+        """Bring the index up to date with the library folder"""
+        with self.lock:
+            db = self._conn()
+            seen = set()
+            for root, dirs, files in os.walk(BASE):
+                dirs[:] = [d for d in dirs if not d.startswith(".")]
+                for f in files:
+                    if not f.lower().endswith(AUDIO_EXTS):
+                        continue
+                    path = os.path.join(root, f)
+                    try:
+                        mtime = os.path.getmtime(path)
+                    except OSError:
+                        continue
+                    seen.add(path)
+                    if path not in self.files or self.files[path][0] != mtime:
+                        self._store(path, mtime, read_index_tags(path))
+            
+            for path in set(self.files) - seen:
+                self._forget(path)
+            db.commit()
+            self.scanned = True
+    
+    def add(self, path, meta, youtube_id=None):
+        """Record a file that was just written"""
+        keys = {"spotify_id": meta.get("id"), "isrc": meta.get("isrc"), "youtube_id": youtube_id or meta.get("youtube_id"),
+                "name": norm_key(meta["track"], meta["artist"])}
+        with self.lock:
+            try:
+                self._conn()
+                self._store(path, os.path.getmtime(path), keys)
+                self.db.commit()
+            except (OSError, sqlite3.Error):
+                pass
+    
+    def find(self, meta=None, youtube_id=None, track=None, artist=None):
+        """Path of an indexed file matching any of the given keys, or None"""
+        if not self.scanned or self.path != os.path.join(BASE, CACHE_FILE):
+            self.scan()
+        
+        candidates = []
+        if meta:
+            candidates += [("spotify_id", meta.get("id")), ("isrc", meta.get("isrc")),
+                           ("youtube_id", meta.get("youtube_id")), ("name", norm_key(meta["track"], meta["artist"]))]
+        if youtube_id:
+            candidates.append(("youtube_id", youtube_id))
+        if track and artist:
+            candidates.append(("name", norm_key(track, artist)))
+        
+        with self.lock:
+            for key in candidates:
+                path = self.lookup.get(key) if key[1] else None
+                if path and os.path.exists(path):
+                    return path
+        return None
+
+LIBRARY = LibraryIndex()
+
+def from_library(out_dir, base=None, meta=None, youtube_id=None, track=None, artist=None):
+    """Skip result if the track is already in the library, None otherwise.
+    
+    A match in another folder counts too: the song is not downloaded or
+    copied a second time.
+    """
+    path = library_file(out_dir, base) if base else None
+    if not path:
+        path = LIBRARY.find(meta=meta, youtube_id=youtube_id, track=track, artist=artist)
+    if not path:
+        return None
+    
+    track, artist = (meta["track"], meta["artist"]) if meta else (track, artist)
+    if os.path.dirname(os.path.abspath(path)) == os.path.abspath(out_dir):
+        print(f"{Fore.YELLOW}[SKIP]{Style.RESET_ALL} Already exists: {os.path.basename(path)}")
+        return {"success": True, "reason": "Already exists", "track": track, "artist": artist}
+    
+    print(f"{Fore.YELLOW}[SKIP]{Style.RESET_ALL} Already in library: {os.path.relpath(path, BASE)}")
+    return {"success": True, "reason": "Already in library", "track": track, "artist": artist}
+
+# ========================= JOURNAL ===========================
+
+class Journal:
+    """Append-only JSONL record of a batch, kept in its output folder.
+    
+    The first line describes the batch and its items; every later line is
+    one state change of one item (resolved, matched, downloaded, encoded,
+    done, failed). Lines are fsynced as they are written so an interrupted
+    run can be resumed without repeating finished work.
+    """
+    def __init__(self, out_dir, name):
+        self.path = os.path.join(out_dir, f"_JOURNAL_{clean_name(name)}.jsonl")
+        self.lock = threading.Lock()
+    
+    def _write(self, entry, mode="a"):
+        with self.lock:
+            with open(self.path, mode, encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def start(self, batch, name, out_dir, items, **extra):
+        """Begin a new journal (replaces any previous one for this folder)"""
+        self._write(dict(extra, batch=batch, name=name, out_dir=out_dir, items=items,
+                         started=time.strftime('%Y-%m-%d %H:%M:%S')), mode="w")
+        return self
+    
+    def record(self, index, state, **data):
+        self._write(dict(data, i=index, state=state))
+    
+    def finish(self):
+        self._write({"finished": time.strftime('%Y-%m-%d %H:%M:%S')})
+    
+    @staticmethod
+    def load(path):
+        """Returns (header, {index: merged item state}, finished)"""
+        header, progress, finished = None, {}, False
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line from a crash
+                if header is None:
+                    header = entry
+                elif "finished" in entry:
+                    finished = True
+                elif "i" in entry:
+                    state = progress.setdefault(entry["i"], {"states": []})
+                    state["states"].append(entry["state"])
+                    state.update(entry)
+        return header, progress, finished
+
+def find_journals():
+    """Batch journals in the library, newest first"""
+    found = []
+    for d in DIRS.values():
+        for root, _, files in os.walk(d):
+            found += [os.path.join(root, f) for f in files if f.startswith("_JOURNAL_") and f.endswith(".jsonl")]
+    return sorted(found, key=os.path.getmtime, reverse=True)
+
+# ========================= YT-DLP ============================
+
+# Shared by every extraction and download; per-call options go through ydl_session()
+YDL_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "logger": yt_logger(),
+    "no_color": True,
+    "http_headers": {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": "https://www.youtube.com/"
+    },
+    "source_address": "0.0.0.0",  # Force IPv4
+}
+
+ydl_local = threading.local()
+
+def ydl_progress(d, hooks=None):
+    """Forward progress to the hooks of the current ydl_session()"""
+    for hook in (ydl_local.hooks if hooks is None else hooks):
+        hook(d)
+
+def ydl_client():
+    """This thread's long-lived YoutubeDL.
+    
+    Extractors, cookie jar and pooled HTTP connections are set up once per
+    worker instead of once per call.
+    """
+    ydl = getattr(ydl_local, "ydl", None)
+    if ydl is None:
+        # Bound to this client's list: fragment downloads report from their own threads
+        hooks = ydl_local.hooks = []
+        ydl = ydl_local.ydl = yt_dlp.YoutubeDL(dict(YDL_OPTS, progress_hooks=[lambda d: ydl_progress(d, hooks)]))
+    return ydl
+
+@contextlib.contextmanager
+def ydl_session(**opts):
+    """ydl_client() with per-call options laid over YDL_OPTS"""
+    ydl = ydl_client()
+    ydl_local.hooks[:] = opts.pop("progress_hooks", [])
+    if "outtmpl" in opts:
+        opts["outtmpl"] = dict(ydl.params["outtmpl"], default=opts["outtmpl"])
+    saved = {k: ydl.params[k] for k in opts if k in ydl.params}
+    selector = ydl.format_selector
+    
+    ydl.params.update(opts)
+    if "format" in opts:
+        fmt = opts["format"]
+        ydl.format_selector = fmt if callable(fmt) else ydl.build_format_selector(fmt)
+    try:
+        yield ydl
+    finally:
+        for k in opts:
+            if k in saved:
+                ydl.params[k] = saved[k]
+            else:
+                ydl.params.pop(k, None)
+        ydl.format_selector = selector
+        ydl_local.hooks[:] = []
+
 # ========================= AUTH ==============================
 
 def init_spotify():
@@ -84,7 +831,10 @@ def init_spotify():
     if not client_id or not client_secret:
         return None
     try:
-        return spotipy.Spotify(auth_manager=SpotifyClientCredentials(client_id=client_id, client_secret=client_secret))
+        auth = SpotifyClientCredentials(client_id=client_id, client_secret=client_secret,
+                                        requests_session=LimitedSession(SPOTIFY_LIMIT))
+        return spotipy.Spotify(auth_manager=auth, requests_session=LimitedSession(SPOTIFY_LIMIT),
+                               requests_timeout=HTTP_TIMEOUT)
     except:
         return None
 
@@ -94,7 +844,9 @@ def init_genius():
     if not token:
         return None
     try:
-        return lyricsgenius.Genius(token, skip_non_songs=True, remove_section_headers=True)
+        client = lyricsgenius.Genius(token, skip_non_songs=True, remove_section_headers=True, timeout=HTTP_TIMEOUT)
+        pooled(client._session)  # Keeps its own headers, shares the connections
+        return client
     except:
         return None
 
@@ -114,7 +866,9 @@ def build_meta(item):
         "disc_no": item["disc_number"],
         "year": item["album"]["release_date"][:4],
         "art": item["album"]["images"][0]["url"] if item["album"]["images"] else None,
-        "duration": item["duration_ms"] / 1000
+        "duration": item["duration_ms"] / 1000,
+        "id": item.get("id"),
+        "isrc": (item.get("external_ids") or {}).get("isrc")
     }
 
 def spotify_meta(track, artist):
@@ -123,10 +877,18 @@ def spotify_meta(track, artist):
         print(f"\n{Fore.RED}[ERROR]{Style.RESET_ALL} Spotify API not configured")
         return None
     
+    key = norm_key(track, artist)
+    cached = META_CACHE.get(key)
+    if cached is not MISS:
+        if cached:
+            print(f"{Fore.GREEN}[CACHED]{Style.RESET_ALL} {cached['track']} by {cached['artist']}")
+        return cached
+    
     try:
         r = sp.search(q=f'{track} {artist}', type="track", limit=20)
         items = r["tracks"]["items"]
         if not items:
+            META_CACHE.set(key, None, ttl_days=SPOTIFY_MISS_TTL_DAYS)
             return None
         
         # Calculate match scores
@@ -155,171 +917,833 @@ def spotify_meta(track, artist):
             match_type = "EXACT" if best_score >= 180 else "GOOD" if best_score >= 130 else "CLOSE"
             color = Fore.GREEN if best_score >= 180 else Fore.YELLOW
             print(f"{color}[{match_type}]{Style.RESET_ALL} {best_item['name']} by {best_item['artists'][0]['name']} (score: {int(best_score)})")
-            return build_meta(best_item)
+            meta = build_meta(best_item)
+            META_CACHE.set(key, meta)
+            return meta
         
         print(f"{Fore.RED}[NO MATCH]{Style.RESET_ALL} for '{track}' by '{artist}'")
+        META_CACHE.set(key, None, ttl_days=SPOTIFY_MISS_TTL_DAYS)
         return None
     except Exception as e:
         print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Spotify: {e}")
         return None
 
+def spotify_id(value, kind="track"):
+    """Extract a Spotify ID from a URI, open.spotify.com URL or bare ID"""
+    m = re.search(rf'(?:spotify:{kind}:|open\.spotify\.com/{kind}/)?\b([A-Za-z0-9]{{22}})\b', (value or "").strip())
+    return m.group(1) if m else None
+
+def spotify_tracks(ids):
+    """Resolve Spotify track IDs in bulk (50 per request), returns {id: meta}"""
+    found = {}
+    missing = []
+    for tid in dict.fromkeys(ids):
+        cached = META_CACHE.get(f"id|{tid}")  # IDs are case-sensitive base62, not norm_key()
+        if cached is not MISS and cached:
+            found[tid] = cached
+        else:
+            missing.append(tid)
+    
+    if not sp:
+        return found
+    
+    for i in range(0, len(missing), 50):
+        chunk = missing[i:i + 50]
+        try:
+            items = sp.tracks(chunk)["tracks"]
+        except Exception as e:
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Spotify: {e}")
+            continue
+        
+        for tid, item in zip(chunk, items):
+            if item:
+                found[tid] = build_meta(item)
+                META_CACHE.set(f"id|{tid}", found[tid])
+    
+    return found
+
+def listing_meta(item):
+    """Metadata from a track object we already have, None if it is incomplete"""
+    if item.get("is_local"):
+        return None
+    try:
+        return build_meta(item)
+    except (KeyError, IndexError, TypeError):
+        return None
+
+# Only the fields build_meta() reads
+PLAYLIST_FIELDS = ("items(track(id,name,is_local,duration_ms,track_number,disc_number,popularity,external_ids,"
+                   "artists(name),album(name,release_date,images,artists(name)))),total,limit,offset")
+
+def spotify_paged(fetch_page, total, limit, first=None):
+    """All items of a paged Spotify listing.
+    
+    fetch_page(offset) returns one page; first is the page at offset 0 if
+    it is already in hand. The remaining pages are fetched concurrently.
+    """
+    items = list(first["items"]) if first else []
+    offsets = list(range(limit if first else 0, total, limit))
+    
+    if offsets:
+        with ThreadPoolExecutor(max_workers=max(1, min(JOBS, len(offsets)))) as pool:
+            for page in pool.map(fetch_page, offsets):
+                items.extend(page["items"])
+    return items
+
 def get_lyrics(track, artist):
     """Fetch lyrics from Genius"""
     if not genius:
         return None
+    
+    key = norm_key(track, artist)
+    cached = LYRICS_CACHE.get(key)
+    if cached is not MISS:
+        return cached
+    
     try:
         song = genius.search_song(track, artist)
-        return song.lyrics if song else None
     except:
-        return None
+        return None  # Network/API errors are not cached
+    
+    lyrics = song.lyrics if song else None
+    LYRICS_CACHE.set(key, lyrics, ttl_days=None if lyrics else LYRICS_MISS_TTL_DAYS)
+    return lyrics
 
-def embed(path, meta, lyrics=None):
-    """Embed ID3 tags and artwork"""
+# Tag fields: (ID3 frame, MP4 atom, Vorbis comment); custom keys are TXXX / iTunes freeform
+TAG_FIELDS = {
+    "title": (TIT2, "\xa9nam", "title"),
+    "artist": (TPE1, "\xa9ART", "artist"),
+    "album": (TALB, "\xa9alb", "album"),
+    "album_artist": (TPE2, "aART", "albumartist"),
+    "track_no": (TRCK, "trkn", "tracknumber"),
+    "disc_no": (TPOS, "disk", "discnumber"),
+    "year": (TDRC, "\xa9day", "date"),
+    "isrc": (TSRC, "----:com.apple.iTunes:ISRC", "isrc"),
+    "spotify_id": ("SPOTIFY_ID", "----:com.apple.iTunes:SPOTIFY_ID", "spotify_id"),
+    "youtube_id": ("YOUTUBE_ID", "----:com.apple.iTunes:YOUTUBE_ID", "youtube_id"),
+}
+
+def write_id3(path, fields, lyrics, art):
     try:
         tags = ID3(path)
     except ID3NoHeaderError:
         tags = ID3()
     
-    tags["TIT2"] = TIT2(encoding=3, text=meta["track"])
-    tags["TPE1"] = TPE1(encoding=3, text=meta["artist"])
-    tags["TALB"] = TALB(encoding=3, text=meta["album"])
-    tags["TPE2"] = TPE2(encoding=3, text=meta["album_artist"])
-    tags["TRCK"] = TRCK(encoding=3, text=str(meta["track_no"]))
-    tags["TPOS"] = TPOS(encoding=3, text=str(meta["disc_no"]))
-    tags["TDRC"] = TDRC(encoding=3, text=meta["year"])
-    
+    for key, value in fields.items():
+        frame = TAG_FIELDS[key][0]
+        if isinstance(frame, str):
+            tags.add(TXXX(encoding=3, desc=frame, text=value))
+        else:
+            tags[frame.__name__] = frame(encoding=3, text=value)
     if lyrics:
         tags["USLT"] = USLT(encoding=3, lang='eng', desc='', text=lyrics)
+    if art:
+        tags.delall("APIC")
+        tags.add(APIC(encoding=3, mime="image/jpeg", type=3, data=art))
+    tags.save(path)
+
+def write_mp4(path, fields, lyrics, art):
+    tags = MP4(path)
+    if tags.tags is None:
+        tags.add_tags()
+    
+    for key, value in fields.items():
+        atom = TAG_FIELDS[key][1]
+        if atom in ("trkn", "disk"):
+            tags[atom] = [(int(value), 0)] if str(value).isdigit() else []
+        elif atom.startswith("----"):
+            tags[atom] = [MP4FreeForm(value.encode("utf-8"))]
+        else:
+            tags[atom] = [value]
+    if lyrics:
+        tags["\xa9lyr"] = [lyrics]
+    if art:
+        fmt = MP4Cover.FORMAT_PNG if art[:4] == b"\x89PNG" else MP4Cover.FORMAT_JPEG
+        tags["covr"] = [MP4Cover(art, imageformat=fmt)]
+    tags.save()
+
+def write_vorbis(path, fields, lyrics, art):
+    tags = OggOpus(path) if path.lower().endswith(".opus") else OggVorbis(path)
+    
+    for key, value in fields.items():
+        tags[TAG_FIELDS[key][2]] = [value]
+    if lyrics:
+        tags["lyrics"] = [lyrics]
+    if art:
+        picture = Picture()
+        picture.type = 3
+        picture.mime = "image/png" if art[:4] == b"\x89PNG" else "image/jpeg"
+        picture.data = art
+        tags["metadata_block_picture"] = [base64.b64encode(picture.write()).decode("ascii")]
+    tags.save()
+
+TAG_WRITERS = {".mp3": write_id3, ".m4a": write_mp4, ".opus": write_vorbis, ".ogg": write_vorbis}
+
+def write_tags(path, fields, lyrics=None, art=None):
+    """Write TAG_FIELDS values, lyrics and cover art in the file's own tag format"""
+    fields = {k: str(v) for k, v in fields.items() if v not in (None, "")}
+    TAG_WRITERS.get(os.path.splitext(path)[1].lower(), write_id3)(path, fields, lyrics, art)
+
+def read_tags(path):
+    """TAG_FIELDS values from a file's tags (missing keys left out)"""
+    ext = os.path.splitext(path)[1].lower()
+    found = {}
+    try:
+        if ext == ".m4a":
+            tags = MP4(path).tags or {}
+            for key, (_, atom, _) in TAG_FIELDS.items():
+                value = tags.get(atom)
+                if value:
+                    value = value[0]
+                    found[key] = value.decode("utf-8") if isinstance(value, bytes) else str(value[0] if isinstance(value, tuple) else value)
+        elif ext in (".opus", ".ogg"):
+            tags = (OggOpus(path) if ext == ".opus" else OggVorbis(path)).tags or {}
+            for key, (_, _, name) in TAG_FIELDS.items():
+                if tags.get(name):
+                    found[key] = tags[name][0]
+        else:
+            tags = ID3(path)
+            for key, (frame, _, _) in TAG_FIELDS.items():
+                frame = tags.get(f"TXXX:{frame}" if isinstance(frame, str) else frame.__name__)
+                if frame and frame.text:
+                    found[key] = str(frame.text[0])
+    except Exception:
+        pass
+    return found
+
+def embed(path, meta, lyrics=None):
+    """Embed tags, lyrics and artwork"""
+    fields = {"title": meta["track"], "artist": meta["artist"], "album": meta["album"],
+              "album_artist": meta["album_artist"], "track_no": meta["track_no"], "disc_no": meta["disc_no"],
+              "year": meta["year"],
+              # Library index keys
+              "isrc": meta.get("isrc"), "spotify_id": meta.get("id"), "youtube_id": meta.get("youtube_id")}
+    art = ART_CACHE.get(meta["art"]) if meta.get("art") else None
+    write_tags(path, fields, lyrics, art)
+    if lyrics:
         print(f"{Fore.GREEN}[✓]{Style.RESET_ALL} Lyrics embedded")
+
+# ========================= STAGING ===========================
+
+def staging_root():
+    """Folder all downloads in progress work in"""
+    return clean_path(STAGING_DIR) if STAGING_DIR else os.path.join(BASE, ".reel_staging")
+
+def staging_dir(out_dir):
+    """Work folder for one output folder's downloads in progress.
     
-    if meta.get("art"):
-        try:
-            img = requests.get(meta["art"], timeout=10).content
-            tags.delall("APIC")
-            tags.add(APIC(encoding=3, mime="image/jpeg", type=3, data=img))
-        except:
-            pass
+    Named after out_dir, so a resumed batch finds its staged files again.
+    """
+    key = hashlib.sha1(os.path.abspath(out_dir).encode("utf-8")).hexdigest()[:12]
+    path = os.path.join(staging_root(), key)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def publish(path, out_dir, meta):
+    """Move a finished, tagged file from staging into out_dir and index it.
     
-    tags.save(path)
+    os.replace is atomic, so the library only ever sees whole files. A
+    staging folder on another filesystem is copied to a hidden file next
+    to the target first and renamed from there.
+    """
+    final = os.path.join(out_dir, os.path.basename(path))
+    try:
+        os.replace(path, final)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        partial = os.path.join(out_dir, f".{os.path.basename(path)}.part")
+        shutil.copyfile(path, partial)
+        os.replace(partial, final)
+        os.remove(path)
+    LIBRARY.add(final, meta)
+    return final
+
+def clean_staging():
+    """Remove staging files left behind by runs that died STAGING_STALE_HOURS ago"""
+    root = staging_root()
+    cutoff = time.time() - STAGING_STALE_HOURS * 3600
+    removed = 0
+    for folder, _, files in os.walk(root, topdown=False):
+        for f in files:
+            path = os.path.join(folder, f)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        if folder != root:
+            with contextlib.suppress(OSError):
+                os.rmdir(folder)  # Only goes if empty
+    if removed:
+        print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Removed {removed} stale file(s) from staging")
 
 # ======================= DOWNLOAD CORE =======================
 
-def download_audio(url, track, artist, out_dir, meta=None):
+def extract_video(url):
+    """Extract a URL's info without resolving formats; pass it on to fetch_audio"""
+    with ydl_session() as ydl:
+        return ydl.extract_info(url, download=False, process=False)
+
+FETCH_RETRIES = 3  # Extra attempts for transient, throttled and slow failures
+RETRY_KINDS = ("transient", "throttled", "slow")
+
+# First match wins; anything unrecognised is treated as transient
+FAILURE_PATTERNS = [
+    # YouTube answers rate limiting with "This content isn't available" too
+    ("throttled", ("http error 429", "too many requests", "rate-limit", "rate limit", "not a bot",
+                   "this content isn't available", "this content is not available")),
+    # A 403/404 on the media stream itself means its URL expired: extract again and retry
+    ("transient", ("unable to download video data", "fragment", "giving up after")),
+    ("restricted", ("available in your country", "geo restrict", "confirm your age", "age-restricted",
+                    "age restricted", "inappropriate for some users", "members-only", "join this channel")),
+    ("gone", ("video unavailable", "private video", "removed by the uploader", "has been removed", "been terminated",
+              "no longer available", "does not exist", "this video is unavailable", "is not a valid url")),
+    # Extractor and format errors come back the same on every try, until yt-dlp or the URL changes
+    ("unsupported", ("unsupported url", "requested format is not available", "no video formats found",
+                     "unable to extract", "please report this issue")),
+]
+
+class FetchError(Exception):
+    """Download failure with its kind: transient, throttled, slow, restricted, gone or unsupported"""
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+def classify_error(message):
+    """Sort a yt-dlp error message into a failure kind"""
+    text = message.lower()
+    for kind, needles in FAILURE_PATTERNS:
+        if any(n in text for n in needles):
+            return kind
+    return "transient"
+
+def retry_delay(attempt, kind):
+    """Jittered exponential backoff; throttling backs off harder, a slow stream not at all"""
+    if kind == "slow":
+        return 0  # The next attempt uses another format or client anyway
+    base = 10 if kind == "throttled" else 2
+    return base * 2 ** attempt * random.uniform(0.5, 1.5)
+
+# Rough quality per kbps relative to AAC (Opus 128k ~ AAC 160k)
+CODEC_EFFICIENCY = {"opus": 1.25, "vorbis": 1.1, "mp4a": 1.0, "aac": 1.0, "mp3": 0.9}
+# Source quality (AAC-equivalent kbps) an output keeps; more is lost in the MP3 V0 re-encode
+AUDIO_CAP_KBPS = {"mp3": 160, "native": None}
+
+def audio_kbps(f):
+    """Audio bitrate of a format, estimated from size when not listed"""
+    kbps = f.get("abr") or (f.get("tbr") if f.get("vcodec") in (None, "none") else None)
+    if not kbps and f.get("filesize") and f.get("duration"):
+        kbps = f["filesize"] * 8 / 1000 / f["duration"]
+    return kbps or 0
+
+def select_audio_format(ctx, avoid=()):
+    """yt-dlp format selector: the cheapest format that still fills the output.
+    
+    Audio-only formats are ranked by bitrate weighted by codec efficiency,
+    capped at what OUTPUT_FORMAT keeps, ties going to the lower bitrate.
+    Without any audio-only format, the smallest muxed format with audio is
+    taken instead of the best video. Formats whose codec the extractor
+    didn't report (generic direct links) come after those, audio-only
+    first, best last as yt-dlp sorts them; only formats known to be
+    silent are never picked. Format ids in avoid (throttled before) are
+    passed over while anything else is left.
+    """
+    candidates = [f for f in ctx["formats"] if f.get("acodec") != "none" and f.get("url")]
+    candidates = [f for f in candidates if f.get("format_id") not in avoid] or candidates
+    formats = [f for f in candidates if f.get("acodec") is not None]
+    unknown = [f for f in candidates if f.get("acodec") is None]
+    audio = [f for f in formats if f.get("vcodec") in (None, "none")]
+    # Dynamic range compressed variants are the same stream, quieter
+    audio = [f for f in audio if "drc" not in str(f.get("format_id"))] or audio
+    
+    if audio:
+        cap = AUDIO_CAP_KBPS.get(OUTPUT_FORMAT)
+        def rank(f):
+            kbps = audio_kbps(f)
+            quality = kbps * CODEC_EFFICIENCY.get(str(f.get("acodec")).split(".")[0], 1.0)
+            return (-(min(quality, cap) if cap else quality), kbps)
+        yield min(audio, key=rank)
+    elif formats:
+        yield min(formats, key=lambda f: f.get("tbr") or float("inf"))
+    elif unknown:
+        yield ([f for f in unknown if f.get("vcodec") == "none"] or unknown)[-1]
+
+THROTTLE_KBS = 64       # Sustained KB/s below which a stream counts as throttled
+THROTTLE_GRACE = 10     # Seconds a download runs before it is judged
+THROTTLE_WINDOW = 8     # Seconds of throughput the judgement looks at
+THROTTLE_MIN_ETA = 30   # Streams this close to done (seconds) are left to finish
+# player_client per attempt after a throttled stream ("default" is yt-dlp's own choice)
+THROTTLE_CLIENTS = ("default", "tv", "mweb", "web_safari")
+
+class Throttled(yt_dlp.utils.DownloadCancelled):
+    """Raised from a progress hook to abort a throttled stream"""
+
+class SpeedMonitor:
+    """Throughput of one download: a speed timeline, and throttle detection.
+    
+    hook() goes in the download's progress_hooks. timeline holds
+    [elapsed s, KB/s] about once a second, for the journal.
+    """
+    
+    def __init__(self):
+        self.start = time.monotonic()
+        self.marks = [(0.0, 0)]  # (elapsed s, bytes downloaded)
+        self.timeline = []
+        self.partial = self.format_id = None
+        self.fragmented = False
+    
+    def hook(self, d):
+        now = time.monotonic() - self.start
+        done = d.get("downloaded_bytes") or d.get("total_bytes") or 0
+        if d["status"] == "finished":
+            self.marks.append((now, done))
+            return
+        if d["status"] != "downloading":
+            return
+        self.partial = d.get("tmpfilename") or self.partial
+        self.format_id = (d.get("info_dict") or {}).get("format_id") or self.format_id
+        self.fragmented = self.fragmented or bool(d.get("fragment_count"))
+        last, last_done = self.marks[-1]
+        if now - last < 1:
+            return
+        self.marks.append((now, done))
+        self.timeline.append([round(now, 1), round((done - last_done) / 1024 / (now - last))])
+        
+        if now >= THROTTLE_GRACE:
+            since, since_done = [m for m in self.marks if m[0] <= now - THROTTLE_WINDOW][-1]
+            kbs = (done - since_done) / 1024 / (now - since)
+            total = d.get("total_bytes") or d.get("total_bytes_estimate")
+            if kbs < THROTTLE_KBS and (not total or (total - done) / 1024 / max(kbs, 1) > THROTTLE_MIN_ETA):
+                raise Throttled(f"{kbs:.0f} KB/s after {now:.0f}s")
+    
+    def average(self):
+        """Mean KB/s over the whole download"""
+        elapsed, done = self.marks[-1]
+        return round(done / 1024 / elapsed) if elapsed else None
+
+class FragmentTuner:
+    """concurrent_fragment_downloads for DASH/HLS streams, tuned on measured throughput.
+    
+    Climbs one step at a time while the next level still buys 10% more
+    speed, steps back when it stops paying off, and halves on throttling.
+    Shared by all workers, so a level learnt on one track carries over.
+    """
+    
+    def __init__(self, limit):
+        self.lock = threading.Lock()
+        self.limit = limit
+        self.level = 1
+        self.speed = {}  # level -> smoothed KB/s
+    
+    def current(self):
+        with self.lock:
+            return self.level
+    
+    def report(self, level, kbs, throttled=False):
+        with self.lock:
+            if throttled:
+                self.level = max(1, level // 2)
+                return
+            if not kbs or level != self.level:
+                return
+            prev = self.speed.get(level)
+            cur = self.speed[level] = kbs if prev is None else (prev + kbs) / 2
+            lower, upper = self.speed.get(level - 1), self.speed.get(level + 1)
+            if lower is not None and cur < lower * 1.1:
+                self.level = level - 1
+            elif level < self.limit and (upper is None or upper >= cur * 1.1):
+                self.level = level + 1
+
+FRAGMENTS = FragmentTuner(8)
+
+def format_summary(info):
+    """Short description of the downloaded format, for logs and the journal"""
+    size = info.get("filesize") or info.get("filesize_approx")
+    return {"format_id": info.get("format_id"), "acodec": info.get("acodec"), "ext": info.get("ext"),
+            "kbps": round(audio_kbps(info)) or None, "mb": round(size / 1048576, 1) if size else None,
+            "audio_only": info.get("vcodec") in (None, "none")}
+
+def fetch_audio(url, out_dir, base, info=None, stream=False):
+    """Download the audio stream picked by select_audio_format as-is.
+    
+    Returns (source file path, format_summary()). With stream set, MP3
+    output and STREAM_ENCODE on, a plain HTTP(S) stream is piped through
+    the encoder instead (stream_mp3); the path is then the finished MP3
+    and the summary has "streamed" set.
+    
+    info from extract_video() is downloaded directly instead of extracting
+    the page again; retries always extract fresh, in case its stream URLs
+    have gone stale. Transient and throttled failures are retried with
+    backoff. A stream SpeedMonitor finds throttled is dropped and retried
+    at once with another format and player client. Raises FetchError
+    once retries are used up or for restricted/gone/unsupported videos.
+    """
+    outtmpl = os.path.join(out_dir, base + ".src.%(ext)s")
+    avoid, client = set(), 0
+    
+    for attempt in range(FETCH_RETRIES + 1):
+        monitor = SpeedMonitor()
+        fragments = FRAGMENTS.current()
+        opts = {"extractor_args": {"youtube": {"player_client": [THROTTLE_CLIENTS[client]]}}} if client else {}
+        piped = streamed = False
+        try:
+            with ydl_session(format=lambda ctx: select_audio_format(ctx, avoid), outtmpl=outtmpl, noplaylist=True,
+                             progress_hooks=([] if shared_worker() else [progress_hook]) + [monitor.hook],
+                             concurrent_fragment_downloads=fragments, **opts) as ydl:
+                pick_only = stream and STREAM_ENCODE and OUTPUT_FORMAT == "mp3"
+                if info and attempt == 0:
+                    result = ydl.process_ie_result(info, download=not pick_only)
+                else:
+                    result = ydl.extract_info(url, download=not pick_only)
+                piped = pick_only and result.get("protocol") in ("http", "https")
+                if piped:
+                    src = os.path.join(out_dir, base + ".mp3")
+                    streamed = stream_mp3(ydl, result, src, monitor)
+                    downloads = [result]
+                else:
+                    if pick_only:
+                        # DASH/HLS fragments need yt-dlp's downloader; encode from a file as usual
+                        result = ydl.process_ie_result(result, download=True)
+                    downloads = result.get("requested_downloads") or [{}]
+                    src = downloads[0].get("filepath") or ydl.prepare_filename(result)
+            if streamed or (not piped and os.path.exists(src)):
+                if monitor.fragmented:
+                    FRAGMENTS.report(fragments, monitor.average())
+                fmt = format_summary(downloads[0] if downloads[0].get("format_id") else result)
+                fmt["kbs"], fmt["timeline"], fmt["streamed"] = monitor.average(), monitor.timeline, streamed
+                print(f"\n{Fore.CYAN}[FORMAT]{Style.RESET_ALL} {fmt['format_id']} {fmt['acodec'] or '?'} "
+                      f"{fmt['kbps'] or '?'}k {fmt['mb'] or '?'}MB @ {fmt['kbs'] or '?'} KB/s"
+                      f"{' (streamed into the encoder)' if streamed else ''}"
+                      f"{'' if fmt['audio_only'] else ' (muxed, no audio-only stream)'}")
+                return src, fmt
+            kind, error = "transient", "Streaming encode failed" if piped else "No audio file written"
+        except Throttled as e:
+            # A throttled stream stays slow; resuming its .part would only continue the crawl
+            if monitor.partial and os.path.exists(monitor.partial):
+                os.remove(monitor.partial)
+            if monitor.format_id:
+                avoid.add(monitor.format_id)
+            client = (client + 1) % len(THROTTLE_CLIENTS)
+            FRAGMENTS.report(fragments, None, throttled=True)
+            kind, error = "slow", f"Throttled stream, format {monitor.format_id or '?'} ({e.msg})"
+        except (yt_dlp.utils.DownloadError, yt_dlp.networking.exceptions.RequestError) as e:
+            error = str(e).replace("ERROR: ", "").strip().splitlines()[0]
+            kind = classify_error(error)
+        
+        if kind not in RETRY_KINDS or attempt == FETCH_RETRIES:
+            raise FetchError(kind, error)
+        delay = retry_delay(attempt, kind)
+        how = f"retrying in {delay:.0f}s" if delay else "retrying with another format and client"
+        print(f"\n{Fore.YELLOW}[RETRY]{Style.RESET_ALL} {kind}: {error} - {how} ({attempt + 1}/{FETCH_RETRIES})")
+        time.sleep(delay)
+
+def transcode_mp3(src, final):
+    """Encode source audio to MP3 (VBR V0) with ffmpeg, removes the source"""
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", src, "-vn",
+           "-codec:a", "libmp3lame", "-q:a", "0", "-f", "mp3", final]
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        if os.path.exists(final):
+            os.remove(final)
+        return False
+    finally:
+        if os.path.exists(src):
+            os.remove(src)
+    return True
+
+STREAM_CHUNK = 10 * 1048576  # Range request size when the format doesn't set one (yt-dlp's YouTube default)
+STREAM_BLOCK = 65536
+
+def stream_mp3(ydl, fmt, final, monitor):
+    """Pipe a plain HTTP(S) audio stream straight into the MP3 encoder.
+    
+    Bytes go from the network into ffmpeg's stdin, so only the MP3 is
+    written, as final + ".part" until ffmpeg is done. The stream is read in
+    Range chunks like yt-dlp does, which keeps YouTube from throttling one
+    long request. Progress goes to the session's hooks, monitor among
+    them. Returns False if ffmpeg fails; network errors and Throttled
+    propagate.
+    """
+    partial = final + ".part"
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", "pipe:0", "-vn",
+           "-codec:a", "libmp3lame", "-q:a", "0", "-f", "mp3", partial]
+    chunk = (fmt.get("downloader_options") or {}).get("http_chunk_size") or STREAM_CHUNK
+    headers = fmt.get("http_headers") or {}
+    total, done = fmt.get("filesize"), 0
+    
+    encoder = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while total is None or done < total:
+            request = yt_dlp.networking.Request(fmt["url"], headers=dict(headers, Range=f"bytes={done}-{done + chunk - 1}"))
+            response = ydl.urlopen(request)
+            if response.status == 206 and not total:
+                total = int(response.headers.get("Content-Range", "").rpartition("/")[2].replace("*", "") or 0) or None
+            got = 0
+            while block := response.read(STREAM_BLOCK):
+                encoder.stdin.write(block)
+                got += len(block)
+                done += len(block)
+                speed = f"{monitor.timeline[-1][1]}KiB/s" if monitor.timeline else "N/A"
+                ydl_progress({"status": "downloading", "downloaded_bytes": done, "total_bytes": total, "info_dict": fmt,
+                              "_percent_str": f"{done * 100 / total:.1f}%" if total else "?", "_speed_str": speed})
+            if response.status != 206 or got < chunk:
+                break  # Whole file in one response, or the last chunk
+        encoder.stdin.close()
+    except BrokenPipeError:
+        # ffmpeg quit on bad input; its exit code below says so
+        with contextlib.suppress(OSError):
+            encoder.stdin.close()
+    except BaseException:
+        encoder.kill()
+        encoder.wait()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    
+    ok = encoder.wait() == 0
+    monitor.hook({"status": "finished", "downloaded_bytes": done})
+    if ok:
+        os.replace(partial, final)
+    elif os.path.exists(partial):
+        os.remove(partial)
+    return ok
+
+# Native mode: codec -> (extension, ffmpeg muxer); other codecs are encoded to MP3
+NATIVE_CONTAINERS = {"opus": (".opus", "opus"), "aac": (".m4a", "ipod"), "vorbis": (".ogg", "ogg"), "mp3": (".mp3", "mp3")}
+
+def probe_codec(src):
+    """Audio codec name of a downloaded stream (ffprobe), or None"""
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries", "stream=codec_name",
+           "-of", "default=noprint_wrappers=1:nokey=1", src]
+    try:
+        return subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def remux_audio(src, base_path):
+    """Copy the audio stream into its native container without re-encoding.
+    
+    Returns the new file path, or None (src kept) if the codec has no
+    container here or ffmpeg fails.
+    """
+    container = NATIVE_CONTAINERS.get(probe_codec(src))
+    if not container:
+        return None
+    ext, muxer = container
+    final = base_path + ext
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", src, "-vn", "-map", "0:a:0", "-map_metadata", "-1", "-c:a", "copy"]
+    if muxer == "ipod":
+        cmd += ["-movflags", "+faststart"]
+    cmd += ["-f", muxer, final]
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        if os.path.exists(final):
+            os.remove(final)
+        return None
+    os.remove(src)
+    return final
+
+def encode_audio(src, out_dir, base):
+    """Turn a downloaded stream into the library file, returns its path or None.
+    
+    OUTPUT_FORMAT "mp3" encodes to MP3 V0; "native" remuxes the stream as it
+    is and only encodes codecs without a native container.
+    """
+    base_path = os.path.join(out_dir, base)
+    if OUTPUT_FORMAT == "native":
+        final = remux_audio(src, base_path)
+        if final:
+            return final
+    final = base_path + ".mp3"
+    return final if transcode_mp3(src, final) else None
+
+def tag_audio(final, meta):
+    """Fetch lyrics and embed tags into a finished file"""
+    lyrics = get_lyrics(meta['track'], meta['artist']) if genius else None
+    embed(final, meta, lyrics)
+
+def tag_basic(final, meta, info=None):
+    """Tag a video that has no Spotify match: title, artist, video ID and thumbnail"""
+    video_id = meta.get("youtube_id")
+    
+    # Try to get YouTube thumbnail as artwork
+    info = info or {}
+    thumbnail_url = info.get("thumbnail") or (info.get("thumbnails") or [{}])[-1].get("url")
+    if not thumbnail_url and video_id:
+        thumbnail_url = f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+    img_data = None
+    if thumbnail_url:
+        try:
+            print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Downloading thumbnail...")
+            img_data = HTTP.get(thumbnail_url, timeout=10).content
+            print(f"{Fore.GREEN}[✓]{Style.RESET_ALL} Thumbnail embedded")
+        except Exception as e:
+            print(f"{Fore.YELLOW}[WARNING]{Style.RESET_ALL} Couldn't download thumbnail")
+    
+    write_tags(final, {"title": meta["track"], "artist": meta["artist"], "youtube_id": video_id}, art=img_data)
+
+def download_audio(url, track, artist, out_dir, meta=None, info=None):
     """Core download function - downloads and tags audio"""
     if not meta:
         meta = spotify_meta(track, artist)
         if not meta:
             return {"success": False, "reason": "No metadata", "track": track, "artist": artist}
     
+    meta = dict(meta, youtube_id=youtube_id(url))
     base = clean_name(f"{meta['track']} - {meta['artist']}")
-    final = os.path.join(out_dir, base + ".mp3")
-    
-    if os.path.exists(final):
-        print(f"{Fore.YELLOW}[SKIP]{Style.RESET_ALL} Already exists: {base}.mp3")
-        return {"success": True, "reason": "Already exists", "track": meta['track'], "artist": meta['artist']}
-    
-    outtmpl = os.path.join(out_dir, base + ".%(ext)s")
-    
-    ydl_opts = {
-        "format": "bestaudio/best",
-        "outtmpl": outtmpl,
-        "quiet": True,
-        "no_warnings": True,
-        "logger": yt_logger(),
-        "noplaylist": True,
-        "progress_hooks": [progress_hook],
-        "http_headers": {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Referer": "https://www.youtube.com/"
-        },
-        "force_ipv4": True,
-        "concurrent_fragment_downloads": 1,
-        "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "0"}],
-        "ignoreerrors": True,
-        "no_color": True
-    }
+    
+    existing = from_library(out_dir, base, meta)
+    if existing:
+        return existing
     
     try:
-        # Suppress stderr output
-        import io
-        import contextlib
-        
-        stderr_buffer = io.StringIO()
-        with contextlib.redirect_stderr(stderr_buffer):
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-        
-        if os.path.exists(final):
-            lyrics = get_lyrics(meta['track'], meta['artist']) if genius else None
-            embed(final, meta, lyrics)
-            print(f"\n{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} {base}.mp3")
+        work = staging_dir(out_dir)
+        src, fmt = fetch_audio(url, work, base, info, stream=True)
+        staged = src if fmt["streamed"] else encode_audio(src, work, base)
+        if staged:
+            tag_audio(staged, meta)
+            final = publish(staged, out_dir, meta)
+            print(f"\n{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} {os.path.basename(final)}")
             return {"success": True, "reason": "Downloaded", "track": meta['track'], "artist": meta['artist']}
+        return {"success": False, "reason": "Conversion failed", "track": track, "artist": artist}
+    except FetchError as e:
+        print(f"\n{Fore.RED}[ERROR]{Style.RESET_ALL} {e}")
+        return {"success": False, "reason": f"Download failed: {e}", "code": e.kind, "track": track, "artist": artist}
     except Exception as e:
         print(f"\n{Fore.RED}[ERROR]{Style.RESET_ALL} {e}")
     
     return {"success": False, "reason": "Download failed", "track": track, "artist": artist}
 
+def entry_url(entry):
+    """Watch URL of a search result, full or flat"""
+    url = entry.get("webpage_url") or entry.get("url")
+    if not url and entry.get("id"):
+        url = f"https://www.youtube.com/watch?v={entry['id']}"
+    return url
+
+def youtube_candidates(query, cancel=None):
+    """Run a YouTube search, returns the fields the scorer needs (cached).
+    
+    The search is flat: title, duration and URL come from the results page
+    itself, without opening each video. Setting the cancel event stops the
+    search before its next result is extracted; a cancelled search returns
+    None and is not cached.
+    """
+    cached = YT_SEARCH_CACHE.get(query)
+    if cached is not MISS:
+        return cached
+    
+    def stop_when_cancelled(info, *, incomplete=False):
+        if cancel.is_set():
+            raise yt_dlp.utils.DownloadCancelled("Search cancelled")
+    
+    opts = {"extract_flat": "in_playlist"}
+    if cancel:
+        opts["match_filter"] = stop_when_cancelled
+    try:
+        with ydl_session(**opts) as ydl:
+            info = ydl.extract_info(query, download=False)
+    except yt_dlp.utils.DownloadCancelled:
+        return None
+    
+    if not info or "entries" not in info:
+        return None
+    
+    candidates = [{"id": e.get("id"), "title": e.get("title") or "", "duration": e.get("duration"),
+                   "webpage_url": entry_url(e)}
+                  for e in info["entries"] if e]
+    YT_SEARCH_CACHE.set(query, candidates)
+    return candidates
+
+YT_QUERIES = ["official audio", "audio", "lyrics"]
+YT_ACCEPT_SCORE = 800  # Good enough to stop searching
+
+search_pool_state = {"size": 0, "pool": None}
+search_pool_lock = threading.Lock()
+
+def search_pool():
+    """Shared pool for YouTube query variants, one slot per query per search worker"""
+    size = len(YT_QUERIES) * stage_jobs("search")
+    with search_pool_lock:
+        if search_pool_state["size"] != size:
+            if search_pool_state["pool"]:
+                search_pool_state["pool"].shutdown(wait=False)
+            search_pool_state["pool"] = ThreadPoolExecutor(max_workers=size, thread_name_prefix="search")
+            search_pool_state["size"] = size
+        return search_pool_state["pool"]
+
+def score_youtube(entry, track, artist, expected_duration, tolerance=15):
+    """Score a search result against the track, None if it can't be the song"""
+    dur = entry.get("duration")
+    title = entry.get("title", "").lower()
+    
+    if not dur:
+        return None
+    
+    # Skip music videos
+    if any(kw in title for kw in ["music video", "official video", "(official video)"]):
+        return None
+    
+    duration_diff = abs(dur - expected_duration)
+    if duration_diff > tolerance:
+        return None
+    
+    # Score calculation
+    score = 1000 - (duration_diff * 50)
+    if "official audio" in title: score += 200
+    elif "audio" in title: score += 100
+    if "lyrics" in title: score += 50
+    if track.lower() in title: score += 100
+    if artist.lower() in title: score += 100
+    if "cover" in title: score -= 300
+    if "remix" in title and "remix" not in track.lower(): score -= 300
+    if "live" in title and "live" not in track.lower(): score -= 200
+    if "instrumental" in title: score -= 400
+    if "karaoke" in title: score -= 500
+    return score
+
 def find_best_youtube(track, artist, expected_duration):
-    """Find best YouTube match using smart scoring"""
+    """Find best YouTube match using smart scoring.
+    
+    All query variants run at once; their results are merged by video ID
+    and the rest are cancelled as soon as one candidate is good enough.
+    """
     best_match = None
     best_score = -1
-    tolerance = 15
+    seen = set()
+    cancel = threading.Event()
     
-    search_queries = [
-        f"ytsearch20:{track} {artist} official audio",
-        f"ytsearch20:{track} {artist} audio",
-        f"ytsearch20:{track} {artist} lyrics",
-    ]
+    pool = search_pool()
+    futures = [pool.submit(youtube_candidates, f"ytsearch20:{track} {artist} {q}", cancel) for q in YT_QUERIES]
     
-    for query in search_queries:
-        try:
-            import io
-            import contextlib
+    try:
+        for future in as_completed(futures):
+            try:
+                entries = future.result()
+            except Exception:
+                continue
             
-            stderr_buffer = io.StringIO()
-            with contextlib.redirect_stderr(stderr_buffer):
-                with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True, "logger": yt_logger(), "no_color": True}) as ydl:
-                    info = ydl.extract_info(query, download=False)
-                    if not info or "entries" not in info:
-                        continue
-                    
-                    for entry in info["entries"]:
-                        dur = entry.get("duration")
-                        title = entry.get("title", "").lower()
-                        
-                        if not dur:
-                            continue
-                        
-                        # Skip music videos
-                        if any(kw in title for kw in ["music video", "official video", "(official video)"]):
-                            continue
-                        
-                        duration_diff = abs(dur - expected_duration)
-                        if duration_diff > tolerance:
-                            continue
-                        
-                        # Score calculation
-                        score = 1000 - (duration_diff * 50)
-                        if "official audio" in title: score += 200
-                        elif "audio" in title: score += 100
-                        if "lyrics" in title: score += 50
-                        if track.lower() in title: score += 100
-                        if artist.lower() in title: score += 100
-                        if "cover" in title: score -= 300
-                        if "remix" in title and "remix" not in track.lower(): score -= 300
-                        if "live" in title and "live" not in track.lower(): score -= 200
-                        if "instrumental" in title: score -= 400
-                        if "karaoke" in title: score -= 500
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_match = entry
+            for entry in entries or []:
+                key = entry.get("id") or entry.get("webpage_url")
+                if key in seen:
+                    continue
+                seen.add(key)
+                
+                score = score_youtube(entry, track, artist, expected_duration)
+                if score is not None and score > best_score:
+                    best_score = score
+                    best_match = entry
             
-            if best_match and best_score >= 800:
-                break
-        except:
-            continue
+            if best_match and best_score >= YT_ACCEPT_SCORE:
+                break
+    finally:
+        cancel.set()
+        for future in futures:
+            future.cancel()
     
     if best_match:
         dur = best_match.get("duration")
@@ -333,56 +1757,328 @@ def find_best_youtube(track, artist, expected_duration):
 def search_youtube_videos(query, limit=5):
     """Search YouTube and return top results for user selection"""
     try:
-        import io
-        import contextlib
-        
         search_query = f"ytsearch{limit}:{query}"
         
-        stderr_buffer = io.StringIO()
-        with contextlib.redirect_stderr(stderr_buffer):
-            with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True, "logger": yt_logger(), "no_color": True}) as ydl:
-                info = ydl.extract_info(search_query, download=False)
-                
-                if not info or "entries" not in info:
-                    return []
-                
-                results = []
-                for entry in info["entries"]:
-                    if entry:
-                        results.append({
-                            "title": entry.get("title", "Unknown"),
-                            "url": entry.get("webpage_url", ""),
-                            "duration": entry.get("duration", 0),
-                            "channel": entry.get("channel", "Unknown")
-                        })
-                
-                return results
+        with ydl_session(extract_flat="in_playlist") as ydl:
+            info = ydl.extract_info(search_query, download=False)
+        
+        if not info or "entries" not in info:
+            return []
+        
+        results = []
+        for entry in info["entries"]:
+            if entry:
+                results.append({
+                    "title": entry.get("title") or "Unknown",
+                    "url": entry_url(entry) or "",
+                    "duration": int(entry.get("duration") or 0),
+                    "channel": entry.get("channel") or entry.get("uploader") or "Unknown"
+                })
+        
+        return results
     except Exception as e:
         print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} YouTube search failed: {e}")
         return []
 
-# ======================= DOWNLOAD OPTIONS ====================
+# ========================= PIPELINE ==========================
 
-def download_track(track, artist, out_dir=None, ask=True):
-    """Download single track with YouTube fallback if Spotify fails"""
-    meta = spotify_meta(track, artist)
+PIPELINE_STAGES = ["resolve", "search", "fetch", "transcode", "tag"]
+
+class Pipeline:
+    """Run jobs through stages connected by bounded queues.
     
-    if not meta:
-        # YouTube fallback for non-Spotify tracks
-        print(f"\n{Fore.YELLOW}[NO SPOTIFY MATCH]{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Searching YouTube directly...")
-        
-        # Search YouTube
-        search_query = f"{track} {artist}"
-        results = search_youtube_videos(search_query, limit=5)
-        
-        if not results:
-            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} No YouTube results found")
-            return {"success": False, "reason": "No results found", "track": track, "artist": artist}
+    Each stage is (name, func, workers). func(job) works on the job dict in
+    place; once a job has a "result" the remaining stages pass it through
+    and on_result(job), if given, is called once for it.
+    """
+    def __init__(self, stages, queue_size=8, on_result=None):
+        self.stages = stages
+        self.on_result = on_result
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.done = {name: 0 for name, _, _ in stages}
+        self.busy = {name: 0.0 for name, _, _ in stages}
+        self.finished = []
+        self.lock = threading.Lock()
+        self.stop = threading.Event()  # Set on Ctrl+C: workers drop queued jobs instead of starting them
+        self.closed = [0] * len(stages)  # Sentinels already sent to each stage
+        self.started = time.time()
+    
+    def _worker(self, idx):
+        name, func, _ = self.stages[idx]
+        worker_local.shared = self.shared
+        while True:
+            job = self.queues[idx].get()
+            if job is None:
+                break
+            if self.stop.is_set():
+                continue
+            
+            if "result" not in job:
+                start = time.time()
+                try:
+                    func(job)
+                except Exception as e:
+                    print(f"\n{Fore.RED}[ERROR]{Style.RESET_ALL} {name}: {e}")
+                    job["result"] = {"success": False, "reason": f"Error: {e}", "track": job["track"], "artist": job["artist"]}
+                with self.lock:
+                    self.done[name] += 1
+                    self.busy[name] += time.time() - start
+                if "result" in job and self.on_result:
+                    try:
+                        self.on_result(job)
+                    except Exception as e:
+                        # The job still goes on, or run() would come back short and the queues stall
+                        print(f"\n{Fore.RED}[ERROR]{Style.RESET_ALL} {name}: couldn't record result: {e}")
+            
+            if idx + 1 < len(self.queues):
+                self.queues[idx + 1].put(job)
+            else:
+                with self.lock:
+                    self.finished.append(job)
+    
+    def run(self, jobs, status_every=30):
+        """Push jobs through every stage, returns jobs in input order"""
+        self.started = time.time()
+        self.shared = len(jobs) > 1  # A single job keeps its progress line
+        threads = []
+        for idx, (_, _, workers) in enumerate(self.stages):
+            stage_threads = [threading.Thread(target=self._worker, args=(idx,), daemon=True) for _ in range(workers)]
+            for t in stage_threads:
+                t.start()
+            threads.append(stage_threads)
+        
+        stop = threading.Event()
+        if status_every:
+            def monitor():
+                while not stop.wait(status_every):
+                    print(f"\n{Fore.CYAN}[PIPELINE]{Style.RESET_ALL} {self.status_line()}")
+            threading.Thread(target=monitor, daemon=True).start()
         
-        # Show results
+        try:
+            for job in jobs:
+                self.queues[0].put(job)
+            self._close(threads)
+        except BaseException:
+            # Ctrl+C: let the workers drain what's queued, finish the jobs they hold, then stop
+            self.stop.set()
+            self._close(threads)
+            raise
+        finally:
+            stop.set()
+        
+        return sorted(self.finished, key=lambda job: job["index"])
+    
+    def _close(self, threads):
+        """Close stages in order: a stage's queue is complete once the one before it has drained"""
+        for idx, stage_threads in enumerate(threads):
+            while self.closed[idx] < len(stage_threads):
+                self.queues[idx].put(None)
+                self.closed[idx] += 1
+            for t in stage_threads:
+                t.join()
+    
+    def stats(self):
+        """Per-stage workers, queue depth, completed jobs, throughput and utilization"""
+        elapsed = max(time.time() - self.started, 1e-6)
+        return {name: {
+            "workers": workers,
+            "queued": self.queues[idx].qsize(),
+            "done": self.done[name],
+            "per_min": self.done[name] * 60 / elapsed,
+            "utilization": self.busy[name] / (elapsed * workers),
+        } for idx, (name, _, workers) in enumerate(self.stages)}
+    
+    def status_line(self):
+        return " | ".join(f"{name}: {st['queued']} queued, {st['done']} done"
+                          for name, st in self.stats().items())
+    
+    def print_stats(self):
+        print(f"\n{Fore.CYAN}[PIPELINE]{Style.RESET_ALL} Stage summary ({time.time() - self.started:.0f}s)")
+        for name, st in self.stats().items():
+            print(f"  {name:<10} workers: {st['workers']:<3} done: {st['done']:<5} "
+                  f"{st['per_min']:.1f}/min  busy: {st['utilization']:.0%}")
+
+def stage_resolve(job):
+    """Spotify lookup, skip check"""
+    print(f"\n{'='*60}")
+    print(f"[{job['index'] + 1}/{job['total']}] {job['artist']} - {job['track']}")
+    print('='*60)
+    
+    # Library index first: known tracks cost no network calls at all
+    if not job.get("meta") and job["resolve"] and not job.get("resumed"):
+        video_id = youtube_id(job["url"]) if job.get("url") else None
+        existing = from_library(job["out_dir"], youtube_id=video_id, track=job["track"], artist=job["artist"])
+        if existing:
+            job["result"] = existing
+            return
+        job["meta"] = spotify_meta(job["track"], job["artist"])
+    if not job.get("meta"):
+        if not job.get("url"):
+            job["result"] = job["fallback"](job["track"], job["artist"], job["out_dir"])
+            return
+        # Known video without a Spotify match keeps its own title (tag_basic)
+        job["meta"] = {"track": job["track"], "artist": job["artist"], "basic": True}
+    
+    meta = job["meta"]
+    job["base"] = clean_name(f"{meta['track']} - {meta['artist']}")
+    job["work"] = staging_dir(job["out_dir"])
+    if job.get("encoded"):
+        job["final"] = job.get("final") or os.path.join(job["work"], job["base"] + ".mp3")
+        if os.path.exists(job["final"]):
+            return  # Resumed after encoding: only tagging is left
+    job["encoded"] = False
+    
+    existing = from_library(job["out_dir"], job["base"], meta)
+    if existing:
+        job["result"] = existing
+        return
+    journal_step(job, "resolved", meta=meta)
+
+def stage_search(job):
+    """YouTube search"""
+    if not job.get("url"):
+        job["url"] = find_best_youtube(job["track"], job["artist"], int(job["meta"]["duration"]))
+        if not job["url"]:
+            job["result"] = {"success": False, "reason": "No YouTube match", "track": job["track"], "artist": job["artist"]}
+            return
+        journal_step(job, "matched", url=job["url"])
+    job["meta"] = dict(job["meta"], youtube_id=youtube_id(job["url"]))
+
+def stage_fetch(job):
+    """Download source audio, or stream it into an MP3 (STREAM_ENCODE)"""
+    if job["encoded"] or (job.get("src") and os.path.exists(job["src"])):
+        return
+    try:
+        job["src"], job["format"] = fetch_audio(job["url"], job["work"], job["base"], job.get("info"), stream=True)
+    except FetchError as e:
+        print(f"\n{Fore.RED}[ERROR]{Style.RESET_ALL} {e}")
+        job["result"] = {"success": False, "reason": f"Download failed: {e}", "code": e.kind,
+                         "track": job["track"], "artist": job["artist"]}
+        return
+    if job["format"]["streamed"]:
+        # Encoded on the way in; the transcode stage has nothing left to do
+        job["final"], job["encoded"] = job["src"], True
+        journal_step(job, "encoded", final=job["final"], format=job["format"])
+        return
+    journal_step(job, "downloaded", src=job["src"], format=job["format"])
+
+def stage_transcode(job):
+    """Encode to MP3"""
+    if job["encoded"]:
+        return
+    job["final"] = encode_audio(job["src"], job["work"], job["base"])
+    if not job["final"]:
+        job["result"] = {"success": False, "reason": "Conversion failed", "track": job["track"], "artist": job["artist"]}
+        return
+    journal_step(job, "encoded", final=job["final"])
+
+def stage_tag(job):
+    """Lyrics, ID3 tags and artwork, then publish into the library"""
+    meta = job["meta"]
+    if meta.get("basic"):
+        tag_basic(job["final"], meta, job.get("info"))
+    else:
+        tag_audio(job["final"], meta)
+    job["final"] = publish(job["final"], job["out_dir"], meta)
+    print(f"\n{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} {os.path.basename(job['final'])}")
+    job["result"] = {"success": True, "reason": "Downloaded", "track": meta['track'], "artist": meta['artist']}
+
+def journal_step(job, state, **data):
+    """Record a job's progress in its batch journal, if it has one"""
+    if job.get("journal"):
+        job["journal"].record(job["index"], state, **data)
+
+def journal_result(job):
+    result = job["result"] if isinstance(job["result"], dict) else {"success": False, "reason": "Download failed"}
+    journal_step(job, "done" if result.get("success") else "failed", reason=result.get("reason"), code=result.get("code"))
+
+def settled(state):
+    """True for journal items a resume leaves alone: done, or failed for good"""
+    if state["state"] == "done":
+        return True
+    return state["state"] == "failed" and state.get("code") not in (None,) + RETRY_KINDS
+
+def settled_result(state, track, artist):
+    """Result dict for a settled journal item"""
+    if state["state"] == "done":
+        return {"success": True, "reason": state.get("reason") or "Done", "track": track, "artist": artist}
+    return {"success": False, "reason": state.get("reason"), "code": state.get("code"), "track": track, "artist": artist}
+
+def download_tracks(items, out_dir, fallback, resolve=True, journal=None, progress=None, urls=None, infos=None):
+    """Download (track, artist, meta) items through the staged pipeline.
+    
+    fallback(track, artist, out_dir) handles items without Spotify metadata.
+    With resolve=False items are not looked up again. journal records every
+    step; progress is the per-item state of a resumed journal. urls gives
+    each item a known video, which skips the YouTube search; videos without
+    a Spotify match get basic tags. infos maps those URLs to already
+    extracted info. Returns result dicts in input order.
+    """
+    funcs = [stage_resolve, stage_search, stage_fetch, stage_transcode, stage_tag]
+    pipeline = Pipeline([(name, func, stage_jobs(name)) for name, func in zip(PIPELINE_STAGES, funcs)],
+                        on_result=journal_result)
+    
+    LIBRARY.scan()
+    jobs = [{"index": i, "total": len(items), "track": t, "artist": a, "meta": meta, "url": urls[i] if urls else None,
+             "out_dir": out_dir, "fallback": fallback, "resolve": resolve, "journal": journal}
+            for i, (t, a, meta) in enumerate(items)]
+    for job in jobs:
+        job["info"] = (infos or {}).get(job["url"])
+    
+    # Pick up where a resumed batch stopped
+    for job in jobs:
+        state = (progress or {}).get(job["index"])
+        if not state:
+            continue
+        if settled(state):
+            job["result"] = settled_result(state, job["track"], job["artist"])
+            continue
+        job["resumed"] = True
+        job["meta"] = state.get("meta") or job["meta"]
+        job["url"] = state.get("url") or job["url"]
+        job["src"] = state.get("src")
+        job["encoded"] = "encoded" in state.get("states", ())
+        job["final"] = state.get("final")
+    
+    results = [job["result"] for job in pipeline.run(jobs)]
+    if journal:
+        journal.finish()
+    
+    pipeline.print_stats()
+    print_cache_stats()
+    SPOTIFY_LIMIT.report()
+    return results
+
+def download_urls(videos, out_dir, journal=None, progress=None, infos=None):
+    """Download {"url", "artist", "track"} items through the staged pipeline.
+    
+    Spotify lookup, download and MP3 encoding run on their own workers as in
+    download_tracks. infos maps URLs to already extracted info. Returns
+    result dicts in input order.
+    """
+    items = [(search_title(v["track"]), v["artist"], None) for v in videos]
+    return download_tracks(items, out_dir, youtube_direct, journal=journal, progress=progress,
+                           urls=[v["url"] for v in videos], infos=infos)
+
+# ======================= DOWNLOAD OPTIONS ====================
+
+def youtube_fallback(track, artist, out_dir=None):
+    """Let the user pick a YouTube result for a track Spotify doesn't have"""
+    print(f"\n{Fore.YELLOW}[NO SPOTIFY MATCH]{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Searching YouTube directly...")
+    
+    # Search YouTube
+    search_query = f"{track} {artist}"
+    results = search_youtube_videos(search_query, limit=5)
+    
+    if not results:
+        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} No YouTube results found")
+        return {"success": False, "reason": "No results found", "track": track, "artist": artist}
+    
+    # Show results (one worker at a time when called from a batch)
+    with PROMPT_LOCK:
         print(f"\n{Fore.CYAN}{'='*60}")
-        print(f"YOUTUBE SEARCH RESULTS")
+        print(f"YOUTUBE SEARCH RESULTS - {track} by {artist}")
         print(f"{'='*60}{Style.RESET_ALL}")
         
         for i, video in enumerate(results, 1):
@@ -394,20 +2090,42 @@ def download_track(track, artist, out_dir=None, ask=True):
             print()
         
         choice = input(f"{Fore.CYAN}Select [1-{len(results)}] or 0 to cancel: {Style.RESET_ALL}").strip()
-        
-        if choice == "0" or not choice.isdigit():
-            return {"success": False, "reason": "Cancelled", "track": track, "artist": artist}
-        
-        idx = int(choice) - 1
-        if idx < 0 or idx >= len(results):
-            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Invalid choice")
-            return {"success": False, "reason": "Invalid choice", "track": track, "artist": artist}
-        
-        selected = results[idx]
-        
-        # Download with basic metadata (no Spotify)
-        out_dir = out_dir or DIRS["SINGLE"]
-        return download_url(selected['url'], out_dir)
+    
+    if choice == "0" or not choice.isdigit():
+        return {"success": False, "reason": "Cancelled", "track": track, "artist": artist}
+    
+    idx = int(choice) - 1
+    if idx < 0 or idx >= len(results):
+        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Invalid choice")
+        return {"success": False, "reason": "Invalid choice", "track": track, "artist": artist}
+    
+    selected = results[idx]
+    
+    # Download with basic metadata (no Spotify)
+    out_dir = out_dir or DIRS["SINGLE"]
+    return download_url(selected['url'], out_dir)
+
+def youtube_direct(track, artist, out_dir):
+    """Download the top YouTube result for a track Spotify doesn't have"""
+    print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} No Spotify metadata, searching YouTube directly...")
+    try:
+        search_query = f"ytsearch1:{track} {artist} audio"
+        with ydl_session(extract_flat="in_playlist") as ydl:
+            info = ydl.extract_info(search_query, download=False)
+        if info and 'entries' in info and info['entries']:
+            video_url = entry_url(info['entries'][0])
+            return download_url(video_url, out_dir)
+        return {"success": False, "reason": "No YouTube results", "track": track, "artist": artist}
+    except Exception as e:
+        return {"success": False, "reason": f"Search failed: {str(e)}", "track": track, "artist": artist}
+
+def download_track(track, artist, out_dir=None, ask=True):
+    """Download single track with YouTube fallback if Spotify fails"""
+    meta = spotify_meta(track, artist)
+    
+    if not meta:
+        # YouTube fallback for non-Spotify tracks
+        return youtube_fallback(track, artist, out_dir)
     
     # Continue with normal Spotify flow
     if ask:
@@ -426,159 +2144,136 @@ def download_track(track, artist, out_dir=None, ask=True):
     
     return download_audio(url, track, artist, out_dir, meta)
 
-def download_url(url, out_dir=None):
-    """Download from direct URL"""
+# Common suffixes cleaned from BOTH track and artist
+TITLE_SUFFIXES = [
+    "(Official Video)", "(Official Audio)", "(Official Music Video)",
+    "[Official Video]", "[Official Audio]", "[Official Music Video]",
+    "(Lyrics)", "[Lyrics]", "(Lyric Video)", "[Lyric Video]",
+    "(Official Lyric Video)", "[Official Lyric Video]",
+    "(Audio)", "[Audio]", "(Visualizer)", "[Visualizer]",
+    "(Official Visualizer)", "[Official Visualizer]",
+    "(Music Video)", "[Music Video]", "(HD)", "[HD]",
+    "(4K)", "[4K]", "(Live)", "[Live]"
+]
+
+def parse_video_title(title, separators=(" - ",)):
+    """Split an "Artist - Track" video title, returns (track, artist).
+    
+    The first of separators found in the title splits it.
+    """
+    for sep in separators:
+        if sep in title:
+            parts = title.split(sep, 1)
+            artist, track = parts[0].strip(), parts[1].strip()
+            break
+    else:
+        track, artist = title, "Unknown"
+    
+    for pattern in TITLE_SUFFIXES:
+        track = track.replace(pattern, "").strip()
+        artist = artist.replace(pattern, "").strip()
+    return track, artist
+
+# Featuring patterns: "ft.", "feat.", "featuring"
+FEAT_PATTERNS = [
+    r'\s+ft\.?\s+.*',  # " ft. Artist"
+    r'\s+feat\.?\s+.*',  # " feat. Artist"
+    r'\s+featuring\s+.*',  # " featuring Artist"
+    r'\s+\(ft\.?.*?\)',  # " (ft. Artist)"
+    r'\s+\[ft\.?.*?\]',  # " [ft. Artist]"
+    r'\s+\(feat\.?.*?\)',  # " (feat. Artist)"
+    r'\s+\[feat\.?.*?\]',  # " [feat. Artist]"
+    r'\s+\[with\s+.*?\]',  # " [with Artist]"
+]
+
+def search_title(track):
+    """Track name without featured artists, for Spotify matching"""
+    for pattern in FEAT_PATTERNS:
+        track = re.sub(pattern, '', track, flags=re.IGNORECASE).strip()
+    return track
+
+def download_url(url, out_dir=None, info=None):
+    """Download from direct URL (info: already extracted by extract_video)"""
     out_dir = out_dir or DIRS["SINGLE"]
     
+    # Known video: skip before extracting anything
+    video_id = youtube_id(url)
+    existing = from_library(out_dir, youtube_id=video_id) if video_id else None
+    if existing:
+        return existing
+    
     try:
-        import io
-        import contextlib
-        
-        stderr_buffer = io.StringIO()
-        with contextlib.redirect_stderr(stderr_buffer):
-            with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True, "logger": yt_logger(), "no_color": True}) as ydl:
-                print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Extracting info...")
-                info = ydl.extract_info(url, download=False)
-                title = info.get("title", "Unknown")
-                
-                # Parse track/artist from title
-                if " - " in title:
-                    parts = title.split(" - ", 1)
-                    artist, track = parts[0].strip(), parts[1].strip()
-                else:
-                    track, artist = title, "Unknown"
-                
-                # Clean up common suffixes from BOTH track and artist
-                cleanup_patterns = [
-                    "(Official Video)", "(Official Audio)", "(Official Music Video)",
-                    "[Official Video]", "[Official Audio]", "[Official Music Video]",
-                    "(Lyrics)", "[Lyrics]", "(Lyric Video)", "[Lyric Video]",
-                    "(Official Lyric Video)", "[Official Lyric Video]",
-                    "(Audio)", "[Audio]", "(Visualizer)", "[Visualizer]",
-                    "(Official Visualizer)", "[Official Visualizer]",
-                    "(Music Video)", "[Music Video]", "(HD)", "[HD]",
-                    "(4K)", "[4K]", "(Live)", "[Live]"
-                ]
-                
-                for pattern in cleanup_patterns:
-                    track = track.replace(pattern, "").strip()
-                    artist = artist.replace(pattern, "").strip()
-                
-                # Remove featuring artists from track name for better Spotify matching
-                # Keep original for metadata, but search without "ft."
-                track_for_search = track
-                
-                # Remove featuring patterns: "ft.", "feat.", "featuring"
-                feat_patterns = [
-                    r'\s+ft\.?\s+.*',  # " ft. Artist"
-                    r'\s+feat\.?\s+.*',  # " feat. Artist"
-                    r'\s+featuring\s+.*',  # " featuring Artist"
-                    r'\s+\(ft\.?.*?\)',  # " (ft. Artist)"
-                    r'\s+\[ft\.?.*?\]',  # " [ft. Artist]"
-                    r'\s+\(feat\.?.*?\)',  # " (feat. Artist)"
-                    r'\s+\[feat\.?.*?\]',  # " [feat. Artist]"
-                ]
-                
-                for pattern in feat_patterns:
-                    track_for_search = re.sub(pattern, '', track_for_search, flags=re.IGNORECASE).strip()
-                
-                print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Parsed: {track} by {artist}")
-                if track_for_search != track:
-                    print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Searching as: {track_for_search} by {artist}")
-                
-                # Try to get Spotify metadata (use cleaned track name for search)
-                meta = spotify_meta(track_for_search, artist)
-                
-                if meta:
-                    # Download with full metadata (use Spotify's proper track name)
-                    print(f"{Fore.GREEN}[INFO]{Style.RESET_ALL} Using Spotify metadata")
-                    return download_audio(url, track_for_search, artist, out_dir, meta)
-                else:
-                    # Download without Spotify - just use basic info
-                    print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} Downloading with basic metadata (no Spotify match)")
-                    
-                    # Use cleaned track name for filename
-                    base = clean_name(f"{track_for_search} - {artist}")
-                    final = os.path.join(out_dir, base + ".mp3")
-                    
-                    if os.path.exists(final):
-                        print(f"{Fore.YELLOW}[SKIP]{Style.RESET_ALL} Already exists: {base}.mp3")
-                        return {"success": True, "reason": "Already exists", "track": track_for_search, "artist": artist}
-                    
-                    outtmpl = os.path.join(out_dir, base + ".%(ext)s")
-                    
-                    ydl_opts = {
-                        "format": "bestaudio/best",
-                        "outtmpl": outtmpl,
-                        "quiet": True,
-                        "no_warnings": True,
-                        "logger": yt_logger(),
-                        "progress_hooks": [progress_hook],
-                        "http_headers": {
-                            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                            "Accept-Language": "en-US,en;q=0.9",
-                            "Referer": "https://www.youtube.com/"
-                        },
-                        "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "0"}],
-                    }
-                    
-                    try:
-                        with yt_dlp.YoutubeDL(ydl_opts) as ydl2:
-                            ydl2.download([url])
-                            
-                            if os.path.exists(final):
-                                # Add basic metadata
-                                try:
-                                    tags = ID3(final)
-                                except ID3NoHeaderError:
-                                    tags = ID3()
-                                
-                                tags["TIT2"] = TIT2(encoding=3, text=track_for_search)
-                                tags["TPE1"] = TPE1(encoding=3, text=artist)
-                                
-                                # Try to get YouTube thumbnail as artwork
-                                thumbnail_url = info.get("thumbnail")
-                                if thumbnail_url:
-                                    try:
-                                        print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Downloading thumbnail...")
-                                        img_data = requests.get(thumbnail_url, timeout=10).content
-                                        tags.delall("APIC")
-                                        tags.add(APIC(encoding=3, mime="image/jpeg", type=3, data=img_data))
-                                        print(f"{Fore.GREEN}[✓]{Style.RESET_ALL} Thumbnail embedded")
-                                    except Exception as e:
-                                        print(f"{Fore.YELLOW}[WARNING]{Style.RESET_ALL} Couldn't download thumbnail")
-                                
-                                tags.save(final)
-                                
-                                print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} {base}.mp3")
-                                return {"success": True, "reason": "Downloaded", "track": track_for_search, "artist": artist}
-                    except Exception as e:
-                        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Download failed: {e}")
-                        return {"success": False, "reason": str(e), "track": track_for_search, "artist": artist}
-                
+        if not info:
+            print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Extracting info...")
+            info = extract_video(url)
+        track, artist = parse_video_title(info.get("title", "Unknown"))
+        
+        # Remove featuring artists from track name for better Spotify matching
+        # Keep original for metadata, but search without "ft."
+        track_for_search = search_title(track)
+        
+        print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Parsed: {track} by {artist}")
+        if track_for_search != track:
+            print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Searching as: {track_for_search} by {artist}")
+        
+        # Try to get Spotify metadata (use cleaned track name for search)
+        meta = spotify_meta(track_for_search, artist)
+        
+        if meta:
+            # Download with full metadata (use Spotify's proper track name)
+            print(f"{Fore.GREEN}[INFO]{Style.RESET_ALL} Using Spotify metadata")
+            return download_audio(url, track_for_search, artist, out_dir, meta, info)
+        
+        # Download without Spotify - just use basic info
+        return download_basic(url, track_for_search, artist, out_dir, info)
+    
     except Exception as e:
         print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} {e}")
         return False
 
+def download_basic(url, track, artist, out_dir, info=None):
+    """Download a video without Spotify metadata: title, artist and thumbnail only"""
+    print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} Downloading with basic metadata (no Spotify match)")
+    meta = {"track": track, "artist": artist, "basic": True, "youtube_id": youtube_id(url)}
+    
+    # Use cleaned track name for filename
+    base = clean_name(f"{track} - {artist}")
+    
+    existing = from_library(out_dir, base, youtube_id=meta["youtube_id"], track=track, artist=artist)
+    if existing:
+        return existing
+    
+    try:
+        work = staging_dir(out_dir)
+        src, fmt = fetch_audio(url, work, base, info, stream=True)
+        staged = src if fmt["streamed"] else encode_audio(src, work, base)
+        if staged:
+            tag_basic(staged, meta, info)
+            final = publish(staged, out_dir, meta)
+            print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} {os.path.basename(final)}")
+            return {"success": True, "reason": "Downloaded", "track": track, "artist": artist}
+    except FetchError as e:
+        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Download failed: {e}")
+        return {"success": False, "reason": f"Download failed: {e}", "code": e.kind, "track": track, "artist": artist}
+    except Exception as e:
+        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Download failed: {e}")
+        return {"success": False, "reason": str(e), "track": track, "artist": artist}
+    
+    return {"success": False, "reason": "Conversion failed", "track": track, "artist": artist}
+
 def process_batch(items, out_dir, item_type="track"):
     """Generic batch processor"""
-    failed = []
+    if item_type == "track":
+        return failed_results(download_tracks([(t, a, None) for t, a in items], out_dir, youtube_fallback))
     
-    for i, item in enumerate(items, 1):
+    def process(i, url):
         print(f"\n{'='*60}")
         print(f"[{i}/{len(items)}] Processing...")
         print('='*60)
-        
-        if item_type == "track":
-            track, artist = item
-            result = download_track(track, artist, out_dir, ask=False)
-        else:  # URL
-            result = download_url(item, out_dir)
-        
-        if isinstance(result, dict) and not result["success"]:
-            failed.append(result)
+        return download_url(url, out_dir)
     
-    return failed
+    LIBRARY.scan()
+    return failed_results(run_pool(process, items, lambda url: {"track": url, "artist": "N/A"}))
 
 def write_failed_log(failed, out_dir, name):
     """Write failed downloads log"""
@@ -591,12 +2286,21 @@ def write_failed_log(failed, out_dir, name):
         f.write(f"Failed Downloads - {name}\n")
         f.write(f"Time: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
         f.write(f"Total: {len(failed)}\n")
+        codes = [item["code"] for item in failed if item.get("code")]
+        if codes:
+            f.write("Codes: " + ", ".join(f"{c} {codes.count(c)}" for c in dict.fromkeys(codes)) + "\n")
         f.write("="*60 + "\n\n")
         
         for item in failed:
-            f.write(f"Track: {item.get('track', 'N/A')}\n")
-            f.write(f"Artist: {item.get('artist', 'N/A')}\n")
-            f.write(f"Reason: {item['reason']}\n")
+            if "title" in item:
+                f.write(f"Title: {item['title']}\n")
+                f.write(f"URL: {item.get('url', 'N/A')}\n")
+            else:
+                f.write(f"Track: {item.get('track', 'N/A')}\n")
+                f.write(f"Artist: {item.get('artist', 'N/A')}\n")
+            f.write(f"Reason: {item.get('reason', 'Unknown')}\n")
+            if item.get("code"):
+                f.write(f"Code: {item['code']}\n")
             f.write("-"*60 + "\n")
     
     print(f"\n{Fore.YELLOW}[WARNING]{Style.RESET_ALL} {len(failed)} failed")
@@ -681,7 +2385,12 @@ def download_spotify_album(album_id):
     
     try:
         album = sp.album(album_id)
-        tracks = [(t["name"], t["artists"][0]["name"]) for t in album["tracks"]["items"]]
+        items = spotify_paged(lambda offset: sp.album_tracks(album_id, limit=50, offset=offset),
+                              album["tracks"]["total"], 50, first=album["tracks"])
+        # Album tracks are simplified objects: hydrate album fields once for all of them
+        album_fields = {"name": album["name"], "artists": album["artists"],
+                        "release_date": album.get("release_date") or "", "images": album.get("images", [])}
+        tracks = [(t["name"], t["artists"][0]["name"], listing_meta(dict(t, album=album_fields))) for t in items]
         name = album["name"]
         artist = album["artists"][0]["name"]
         year = album["release_date"][:4] if album.get("release_date") else "?"
@@ -698,7 +2407,7 @@ def download_spotify_album(album_id):
         print(f"{Fore.GREEN}Year:{Style.RESET_ALL} {year}")
         print(f"{Fore.GREEN}Tracks:{Style.RESET_ALL} {len(tracks)}\n")
         
-        for i, (t, a) in enumerate(tracks, 1):
+        for i, (t, a, _) in enumerate(tracks, 1):
             print(f"{Fore.GREEN}[{i}]{Style.RESET_ALL} {t}")
         
         remove = input(f"\n{Fore.CYAN}Remove tracks (comma-separated, Enter for none): {Style.RESET_ALL}").strip()
@@ -718,14 +2427,8 @@ def download_spotify_album(album_id):
         
         print(f"\n{Fore.CYAN}[INFO]{Style.RESET_ALL} Downloading to: {out_dir}\n")
         
-        failed = []
-        for i, (t, a) in enumerate(tracks, 1):
-            print(f"\n{'='*60}")
-            print(f"[{i}/{len(tracks)}] {a} - {t}")
-            print('='*60)
-            result = download_track(t, a, out_dir, ask=False)
-            if not result["success"]:
-                failed.append(result)
+        journal = Journal(out_dir, name).start("tracks", name, out_dir, tracks, fallback="interactive", resolve=True)
+        failed = failed_results(download_tracks(tracks, out_dir, youtube_fallback, journal=journal))
         
         write_failed_log(failed, out_dir, name)
     except Exception as e:
@@ -776,47 +2479,19 @@ def process_csv(csv_path):
             
             # Handle TuneMyMusic format where artist is in track name
             if track and not artist and ' - ' in track:
-                # Track name format: "Artist - Song Title"
-                parts = track.split(' - ', 1)
-                artist = parts[0].strip()
-                track = parts[1].strip()
-                
-                # Clean up YouTube suffixes from track name
-                cleanup_patterns = [
-                    "(Official Video)", "(Official Audio)", "(Official Music Video)",
-                    "[Official Video]", "[Official Audio]", "[Official Music Video]",
-                    "(Lyrics)", "[Lyrics]", "(Lyric Video)", "[Lyric Video]",
-                    "(Official Lyric Video)", "[Official Lyric Video]",
-                    "(Audio)", "[Audio]", "(Visualizer)", "[Visualizer]",
-                    "(Official Visualizer)", "[Official Visualizer]",
-                    "(Music Video)", "[Music Video]", "(HD)", "[HD]",
-                    "(4K)", "[4K]", "(Live)", "[Live]"
-                ]
-                
-                for pattern in cleanup_patterns:
-                    track = track.replace(pattern, "").strip()
-                
-                # Remove featuring artists for better Spotify matching
-                import re
-                feat_patterns = [
-                    r'\s+ft\.?\s+.*',
-                    r'\s+feat\.?\s+.*',
-                    r'\s+featuring\s+.*',
-                    r'\s+\(ft\.?.*?\)',
-                    r'\s+\[ft\.?.*?\]',
-                    r'\s+\(feat\.?.*?\)',
-                    r'\s+\[feat\.?.*?\]',
-                    r'\s+\[with\s+.*?\]',
-                ]
-                
-                for pattern in feat_patterns:
-                    track = re.sub(pattern, '', track, flags=re.IGNORECASE).strip()
+                # Track name format: "Artist - Song Title", cleaned like a video title
+                track, artist = parse_video_title(track)
+                track = search_title(track)
                 
                 if row_count <= 3:
                     print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Parsed from track: '{artist}' - '{track}'")
             
+            # Exportify-style exports carry the Spotify track URI
+            track_id = spotify_id(row.get('Track URI') or row.get('Track ID') or row.get('Spotify ID') or
+                                  row.get('uri') or row.get('id'))
+            
             if track and artist:
-                tracks.append((track.strip(), artist.strip()))
+                tracks.append((track.strip(), artist.strip(), track_id))
             else:
                 if row_count <= 3:  # Show first 3 failed rows
                     print(f"{Fore.YELLOW}[DEBUG]{Style.RESET_ALL} Row {row_count} skipped - Track: '{track}', Artist: '{artist}'")
@@ -827,6 +2502,7 @@ def process_csv(csv_path):
         print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} Supported column names:")
         print(f"  Track: 'Track Name', 'track', 'Track', 'name', 'Name', 'Track name'")
         print(f"  Artist: 'Artist', 'artist', 'Artist Name', 'Artist name', 'Artist Name(s)'")
+        print(f"  Spotify ID (optional): 'Track URI', 'Track ID', 'Spotify ID'")
         return
     
     csv_name = os.path.splitext(os.path.basename(csv_path))[0]
@@ -835,13 +2511,24 @@ def process_csv(csv_path):
     
     # Fetch metadata for preview
     print(f"\n{Fore.CYAN}[INFO]{Style.RESET_ALL} Fetching metadata for {len(tracks)} tracks...")
-    tracks_with_meta = []
-    for i, (t, a) in enumerate(tracks, 1):
+    ids = [tid for _, _, tid in tracks if tid]
+    by_id = spotify_tracks(ids) if ids else {}
+    if ids:
+        print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Resolved {len(by_id)}/{len(set(ids))} tracks by Spotify ID")
+    
+    def lookup(i, item):
+        t, a, tid = item
+        if tid in by_id:
+            return (t, a, by_id[tid])
+        # Fuzzy search only for rows without a usable ID
         print(f"\r{Fore.CYAN}[{i}/{len(tracks)}]{Style.RESET_ALL} Checking: {t[:30]}...", end='', flush=True)
-        meta = spotify_meta(t, a)
-        tracks_with_meta.append((t, a, meta))
+        return (t, a, spotify_meta(t, a))
+    
+    tracks_with_meta = run_pool(lookup, tracks)
+    tracks_with_meta = [r if isinstance(r, tuple) else (t, a, None) for r, (t, a, _) in zip(tracks_with_meta, tracks)]
     
     print()  # New line
+    print_cache_stats()
     
     # Show preview
     print(f"\n{Fore.CYAN}{'='*60}")
@@ -870,37 +2557,9 @@ def process_csv(csv_path):
     
     print(f"\n{Fore.CYAN}[INFO]{Style.RESET_ALL} Downloading to: {out_dir}\n")
     
-    # Download
-    failed = []
-    for i, (t, a, meta) in enumerate(tracks_with_meta, 1):
-        print(f"\n{'='*60}")
-        print(f"[{i}/{len(tracks_with_meta)}] {a} - {t}")
-        print('='*60)
-        
-        if meta:
-            # Has Spotify metadata - use the smart download
-            url = find_best_youtube(t, a, int(meta["duration"]))
-            if url:
-                result = download_audio(url, t, a, out_dir, meta)
-            else:
-                result = {"success": False, "reason": "No YouTube match", "track": t, "artist": a}
-        else:
-            # No Spotify metadata - try direct YouTube search and download
-            print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} No Spotify metadata, searching YouTube directly...")
-            try:
-                search_query = f"ytsearch1:{t} {a} audio"
-                with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True}) as ydl:
-                    info = ydl.extract_info(search_query, download=False)
-                    if info and 'entries' in info and info['entries']:
-                        video_url = info['entries'][0]['webpage_url']
-                        result = download_url(video_url, out_dir)
-                    else:
-                        result = {"success": False, "reason": "No YouTube results", "track": t, "artist": a}
-            except Exception as e:
-                result = {"success": False, "reason": f"Search failed: {str(e)}", "track": t, "artist": a}
-        
-        if not result["success"]:
-            failed.append(result)
+    # Download (rows without Spotify metadata go straight to YouTube)
+    journal = Journal(out_dir, csv_name).start("tracks", csv_name, out_dir, tracks_with_meta, fallback="direct", resolve=False)
+    failed = failed_results(download_tracks(tracks_with_meta, out_dir, youtube_direct, resolve=False, journal=journal))
     
     write_failed_log(failed, out_dir, csv_name)
 
@@ -928,29 +2587,17 @@ def process_urls_txt(txt_path):
     
     # Extract video info for preview
     print(f"\n{Fore.CYAN}[INFO]{Style.RESET_ALL} Extracting info from {len(urls)} URLs...")
-    video_info = []
-    for i, url in enumerate(urls, 1):
+    infos = {}  # Handed to the downloads so no page is extracted twice
+    def extract(i, url):
         print(f"\r{Fore.CYAN}[{i}/{len(urls)}]{Style.RESET_ALL} Processing...", end='', flush=True)
         try:
-            with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-                title = info.get("title", "Unknown")
-                
-                # Parse track/artist
-                if " - " in title:
-                    parts = title.split(" - ", 1)
-                    artist, track = parts[0].strip(), parts[1].strip()
-                else:
-                    track, artist = title, "Unknown"
-                
-                # Clean up
-                for suffix in ["(Official Video)", "(Official Audio)", "(Lyrics)", "[Official Video]", "[Official Audio]", "[Lyrics]"]:
-                    track = track.replace(suffix, "").strip()
-                    artist = artist.replace(suffix, "").strip()
-                
-                video_info.append((url, artist, track))
-        except:
-            video_info.append((url, "Unknown", "Failed to extract"))
+            info = infos[url] = extract_video(url)
+            track, artist = parse_video_title(info.get("title", "Unknown"))
+            return (url, artist, track)
+        except Exception as e:
+            return (url, None, str(e).replace("ERROR: ", "").strip().splitlines()[0] if str(e) else "Unknown error")
+    
+    video_info = run_pool(extract, urls)
     
     print()  # New line
     
@@ -959,7 +2606,10 @@ def process_urls_txt(txt_path):
     print(f"TXT PREVIEW - {txt_name} ({len(video_info)} URLs)")
     print(f"{'='*60}{Style.RESET_ALL}")
     for i, (url, artist, track) in enumerate(video_info, 1):
-        print(f"{Fore.WHITE}[{i}] {artist} - {track}{Style.RESET_ALL}")
+        if artist is None:
+            print(f"{Fore.RED}[{i}] {url} [FAILED TO EXTRACT]{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.WHITE}[{i}] {artist} - {track}{Style.RESET_ALL}")
     
     remove = input(f"\n{Fore.CYAN}Remove URLs (comma-separated numbers, Enter for none): {Style.RESET_ALL}").strip()
     if remove:
@@ -970,8 +2620,14 @@ def process_urls_txt(txt_path):
         except:
             pass
     
+    # Without a title there is nothing to name or match the file by: report, don't download
+    unreadable = [{"success": False, "title": url, "url": url, "reason": f"Could not extract info: {error}",
+                   "code": classify_error(error)} for url, artist, error in video_info if artist is None]
+    video_info = [v for v in video_info if v[1] is not None]
+    
     if not video_info:
         print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} No URLs remaining")
+        write_failed_log(unreadable, out_dir, txt_name)
         return
     
     if input(f"\n{Fore.CYAN}Download {len(video_info)} videos? [Y/N]: {Style.RESET_ALL}").strip().lower() != "y":
@@ -980,23 +2636,9 @@ def process_urls_txt(txt_path):
     print(f"\n{Fore.CYAN}[INFO]{Style.RESET_ALL} Downloading to: {out_dir}\n")
     
     # Download each URL
-    failed = []
-    for i, (url, artist, track) in enumerate(video_info, 1):
-        print(f"\n{'='*60}")
-        print(f"[{i}/{len(video_info)}] {artist} - {track}")
-        print('='*60)
-        result = download_url(url, out_dir)
-        if isinstance(result, dict) and not result["success"]:
-            failed.append(result)
-    
-    write_failed_log(failed, out_dir, txt_name)
-    for i, url in enumerate(urls, 1):
-        print(f"\n{'='*60}")
-        print(f"[{i}/{len(urls)}] {url}")
-        print('='*60)
-        result = download_url(url, out_dir)
-        if isinstance(result, dict) and not result.get("success"):
-            failed.append(result)
+    videos = [{"url": url, "artist": artist, "track": track} for url, artist, track in video_info]
+    journal = Journal(out_dir, txt_name).start("urls", txt_name, out_dir, videos)
+    failed = unreadable + failed_results(download_urls(videos, out_dir, journal, infos=infos))
     
     write_failed_log(failed, out_dir, txt_name)
 
@@ -1007,13 +2649,17 @@ def download_spotify_playlist(playlist_id):
         return
     
     try:
-        results = sp.playlist_tracks(playlist_id)
-        tracks = [(item["track"]["name"], item["track"]["artists"][0]["name"]) 
-                  for item in results["items"] if item["track"]]
-        
-        playlist = sp.playlist(playlist_id)
+        playlist = sp.playlist(playlist_id, fields="name,tracks(total)")
         name = playlist["name"]
         
+        def page(offset):
+            return sp.playlist_items(playlist_id, fields=PLAYLIST_FIELDS, limit=100, offset=offset,
+                                     additional_types=("track",))
+        
+        items = spotify_paged(page, playlist["tracks"]["total"], 100)
+        tracks = [(item["track"]["name"], item["track"]["artists"][0]["name"], listing_meta(item["track"]))
+                  for item in items if item.get("track") and item["track"].get("name")]
+        
         out_dir = os.path.join(DIRS["PLAYLIST"], clean_name(name))
         os.makedirs(out_dir, exist_ok=True)
         
@@ -1021,7 +2667,7 @@ def download_spotify_playlist(playlist_id):
         print(f"\n{Fore.CYAN}{'='*60}")
         print(f"SPOTIFY PLAYLIST PREVIEW - {name} ({len(tracks)} tracks)")
         print(f"{'='*60}{Style.RESET_ALL}")
-        for i, (t, a) in enumerate(tracks, 1):
+        for i, (t, a, _) in enumerate(tracks, 1):
             print(f"{Fore.GREEN}[{i}]{Style.RESET_ALL} {a} - {t}")
         
         remove = input(f"\n{Fore.CYAN}Remove tracks (comma-separated, Enter for none): {Style.RESET_ALL}").strip()
@@ -1042,131 +2688,157 @@ def download_spotify_playlist(playlist_id):
         
         print(f"\n{Fore.CYAN}[INFO]{Style.RESET_ALL} Downloading to: {out_dir}\n")
         
-        failed = []
-        for i, (t, a) in enumerate(tracks, 1):
-            print(f"\n{'='*60}")
-            print(f"[{i}/{len(tracks)}] {a} - {t}")
-            print('='*60)
-            result = download_track(t, a, out_dir, ask=False)
-            if not result["success"]:
-                failed.append(result)
+        journal = Journal(out_dir, name).start("tracks", name, out_dir, tracks, fallback="interactive", resolve=True)
+        failed = failed_results(download_tracks(tracks, out_dir, youtube_fallback, journal=journal))
         
         write_failed_log(failed, out_dir, name)
     except Exception as e:
         print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} {e}")
 
+def youtube_playlist_videos(entries):
+    """Parse artist and track from flat playlist entries"""
+    videos = []
+    for entry in entries:
+        if not entry or not entry.get("id"):
+            continue
+        video_title = entry.get("title") or "Unknown"
+        
+        # "Artist - Track", or "Artist: Track" as some channels title their uploads
+        track, artist = parse_video_title(video_title, separators=(" - ", ": "))
+        
+        videos.append({"url": f"https://www.youtube.com/watch?v={entry['id']}", "title": video_title,
+                       "artist": artist, "track": track})
+    return videos
+
 def download_youtube_playlist(playlist_url):
-    """Download YouTube playlist"""
+    """Download YouTube playlist.
+    
+    The flat listing is all that is extracted up front. Videos then go
+    through the track pipeline with their URL already known: Spotify
+    lookups for the whole playlist run on the resolve workers while earlier
+    videos are downloading, and each video is extracted once, when it is
+    fetched.
+    """
     try:
-        import io
-        import contextlib
-        
-        stderr_buffer = io.StringIO()
-        with contextlib.redirect_stderr(stderr_buffer):
-            with yt_dlp.YoutubeDL({"quiet": True, "extract_flat": True, "no_warnings": True, "logger": yt_logger(), "no_color": True}) as ydl:
-                info = ydl.extract_info(playlist_url, download=False)
-                if not info or not info.get("entries"):
-                    print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Playlist empty/private")
-                    return
-                
-                name = info.get("title", "YouTube Playlist")
-                entries = info["entries"]
-                
-                print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} {name} ({len(entries)} videos)")
-                print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Parsing video titles...")
-                
-                # Extract and parse video information
-                videos = []
-                for i, entry in enumerate(entries, 1):
-                    if entry:
-                        print(f"\r{Fore.CYAN}[{i}/{len(entries)}]{Style.RESET_ALL} Processing...", end='', flush=True)
-                        video_url = f"https://www.youtube.com/watch?v={entry.get('id')}"
-                        video_title = entry.get("title", "Unknown")
-                        
-                        # Parse artist and track
-                        title = video_title
-                        # Remove common suffixes first
-                        for suffix in ["(Official Video)", "(Official Audio)", "(Official Music Video)", 
-                                      "[Official Video]", "[Official Audio]", "(Lyrics)", "[Lyrics]",
-                                      "(Audio)", "[Audio]", "(Visualizer)", "[Visualizer]"]:
-                            title = title.replace(suffix, "").strip()
-                        
-                        # Parse format: "Artist - Track" or "Track - Artist"
-                        if " - " in title:
-                            parts = title.split(" - ", 1)
-                            artist, track = parts[0].strip(), parts[1].strip()
-                        elif ": " in title:
-                            parts = title.split(": ", 1)
-                            artist, track = parts[0].strip(), parts[1].strip()
-                        else:
-                            track, artist = title, "Unknown"
-                        
-                        videos.append({"url": video_url, "title": video_title, "artist": artist, "track": track})
-                
-                print()  # New line
-            
-            # Show full preview with parsed names
-            print(f"\n{Fore.CYAN}{'='*60}")
-            print(f"YOUTUBE PLAYLIST PREVIEW - {name} ({len(videos)} videos)")
-            print(f"{'='*60}{Style.RESET_ALL}")
-            for i, video in enumerate(videos, 1):
-                print(f"{Fore.WHITE}[{i}] {video['artist']} - {video['track']}{Style.RESET_ALL}")
-            
-            remove = input(f"\n{Fore.CYAN}Videos to remove (comma-separated, Enter for none): {Style.RESET_ALL}").strip()
-            if remove:
-                try:
-                    bad = {int(x.strip())-1 for x in remove.split(",") if x.strip().isdigit()}
-                    videos = [v for i, v in enumerate(videos) if i not in bad]
-                    print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} Removed {len(bad)} videos, {len(videos)} remaining")
-                except:
-                    pass
-            
-            if not videos:
-                print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} No videos remaining")
-                return
-            
-            if input(f"\n{Fore.CYAN}Download {len(videos)} videos? [Y/N]: {Style.RESET_ALL}").strip().lower() != "y":
-                return
-            
-            out_dir = os.path.join(DIRS["YT_PLAYLIST"], clean_name(name))
-            os.makedirs(out_dir, exist_ok=True)
-            
-            print(f"\n{Fore.CYAN}[INFO]{Style.RESET_ALL} Downloading to: {out_dir}\n")
-            
-            # Download each video
-            failed = []
-            
-            for i, video in enumerate(videos, 1):
-                print(f"\n{'='*60}")
-                print(f"[{i}/{len(videos)}] {video['artist']} - {video['track']}")
-                print('='*60)
-                
-                result = download_url(video['url'], out_dir)
-                if isinstance(result, dict) and not result.get("success"):
-                    failed.append({"title": video['title'], "url": video['url'], "reason": result.get("reason", "Unknown")})
-            
-            # Write failed log
-            if failed:
-                log_file = os.path.join(out_dir, f"_FAILED_DOWNLOADS_{clean_name(name)}.txt")
-                with open(log_file, 'w', encoding='utf-8') as f:
-                    f.write(f"Failed Downloads - {name}\n")
-                    f.write(f"Time: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write(f"Total: {len(failed)}\n")
-                    f.write("="*60 + "\n\n")
-                    
-                    for item in failed:
-                        f.write(f"Title: {item['title']}\n")
-                        f.write(f"URL: {item['url']}\n")
-                        f.write(f"Reason: {item['reason']}\n")
-                        f.write("-"*60 + "\n")
-                
-                print(f"\n{Fore.YELLOW}[WARNING]{Style.RESET_ALL} {len(failed)} failed")
-                print(f"{Fore.CYAN}[LOG]{Style.RESET_ALL} {log_file}")
-            else:
-                print(f"\n{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} All downloads completed!")
+        with ydl_session(extract_flat="in_playlist") as ydl:
+            info = ydl.extract_info(playlist_url, download=False)
+        if not info or not info.get("entries"):
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Playlist empty/private")
+            return
+        
+        name = info.get("title", "YouTube Playlist")
+        entries = list(info["entries"])
+        
+        print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} {name} ({len(entries)} videos)")
+        videos = youtube_playlist_videos(entries)
+        
+        # Show full preview with parsed names
+        print(f"\n{Fore.CYAN}{'='*60}")
+        print(f"YOUTUBE PLAYLIST PREVIEW - {name} ({len(videos)} videos)")
+        print(f"{'='*60}{Style.RESET_ALL}")
+        for i, video in enumerate(videos, 1):
+            print(f"{Fore.WHITE}[{i}] {video['artist']} - {video['track']}{Style.RESET_ALL}")
+        
+        remove = input(f"\n{Fore.CYAN}Videos to remove (comma-separated, Enter for none): {Style.RESET_ALL}").strip()
+        if remove:
+            try:
+                bad = {int(x.strip())-1 for x in remove.split(",") if x.strip().isdigit()}
+                videos = [v for i, v in enumerate(videos) if i not in bad]
+                print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} Removed {len(bad)} videos, {len(videos)} remaining")
+            except:
+                pass
+        
+        if not videos:
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} No videos remaining")
+            return
+        
+        if input(f"\n{Fore.CYAN}Download {len(videos)} videos? [Y/N]: {Style.RESET_ALL}").strip().lower() != "y":
+            return
+        
+        out_dir = os.path.join(DIRS["YT_PLAYLIST"], clean_name(name))
+        os.makedirs(out_dir, exist_ok=True)
+        
+        print(f"\n{Fore.CYAN}[INFO]{Style.RESET_ALL} Downloading to: {out_dir}\n")
+        
+        # Spotify lookups use the title without featured artists
+        items = [(search_title(v["track"]), v["artist"], None) for v in videos]
+        urls = [v["url"] for v in videos]
+        journal = Journal(out_dir, name).start("tracks", name, out_dir, items, fallback="interactive",
+                                               resolve=True, urls=urls, titles=[v["title"] for v in videos])
+        results = download_tracks(items, out_dir, youtube_fallback, journal=journal, urls=urls)
+        failed = [dict(result, title=video['title'], url=video['url'])
+                  for video, result in zip(videos, results) if isinstance(result, dict) and not result.get("success")]
+        
+        write_failed_log(failed, out_dir, name)
     except Exception as e:
         print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} {e}")
 
+def resume_batch(path):
+    """Continue an interrupted batch from its journal"""
+    try:
+        header, progress, finished = Journal.load(path)
+    except OSError as e:
+        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} {e}")
+        return
+    if not header or "batch" not in header:
+        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Not a batch journal")
+        return
+    
+    name, out_dir, items = header["name"], header["out_dir"], header["items"]
+    done = sum(1 for state in progress.values() if state["state"] == "done")
+    left = len(items) - sum(1 for state in progress.values() if settled(state))
+    print(f"\n{Fore.CYAN}[RESUME]{Style.RESET_ALL} {name}: {done}/{len(items)} done, {left} to go")
+    if not left:
+        print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Nothing left to do (remaining failures are unavailable videos)")
+        return
+    
+    journal = Journal(out_dir, name)
+    os.makedirs(out_dir, exist_ok=True)
+    if header["batch"] == "tracks":
+        fallback = youtube_direct if header.get("fallback") == "direct" else youtube_fallback
+        urls, titles = header.get("urls"), header.get("titles")
+        results = download_tracks([tuple(item) for item in items], out_dir, fallback,
+                                  resolve=header.get("resolve", True), journal=journal, progress=progress, urls=urls)
+        if titles:
+            failed = [dict(result, title=title, url=url)
+                      for title, url, result in zip(titles, urls, results) if isinstance(result, dict) and not result.get("success")]
+        else:
+            failed = failed_results(results)
+    else:
+        results = download_urls(items, out_dir, journal, progress)
+        failed = [dict(result, title=video["title"], url=video["url"]) if "title" in video else result
+                  for video, result in zip(items, results) if not result.get("success")]
+    
+    write_failed_log(failed, out_dir, name)
+
+def resume_menu():
+    """Pick an interrupted batch to resume"""
+    journals = []
+    for path in find_journals():
+        try:
+            header, progress, finished = Journal.load(path)
+        except OSError:
+            continue
+        if not header or "batch" not in header:
+            continue
+        done = sum(1 for state in progress.values() if state["state"] == "done")
+        left = len(header["items"]) - sum(1 for state in progress.values() if settled(state))
+        if not finished or left:
+            journals.append((path, header["name"], done, len(header["items"]), finished))
+    
+    if not journals:
+        print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} No unfinished batches found")
+        return
+    
+    print(f"\n{Fore.CYAN}=== UNFINISHED BATCHES ==={Style.RESET_ALL}")
+    for i, (path, name, done, total, finished) in enumerate(journals, 1):
+        status = "failed items" if finished else "interrupted"
+        print(f"{Fore.WHITE}[{i}] {name} - {done}/{total} done ({status}){Style.RESET_ALL}")
+    
+    choice = input(f"\n{Fore.CYAN}Select [1-{len(journals)}] or 0 to cancel: {Style.RESET_ALL}").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(journals):
+        resume_batch(journals[int(choice) - 1][0])
+
 # ======================== SETTINGS ============================
 # ======================= SETTINGS ============================
 
@@ -1174,6 +2846,20 @@ def save_config():
     """Save config to file"""
     config = {
         "LIBRARY_PATH": BASE,
+        "JOBS": JOBS,
+        "STAGE_JOBS": ",".join(f"{k}={v}" for k, v in STAGE_JOBS.items()),
+        "CACHE_TTL_DAYS": CACHE_TTL_DAYS,
+        "CACHE_MAX_ENTRIES": CACHE_MAX_ENTRIES,
+        "YT_CACHE_TTL_DAYS": YT_CACHE_TTL_DAYS,
+        "LYRICS_MISS_TTL_DAYS": LYRICS_MISS_TTL_DAYS,
+        "SPOTIFY_MISS_TTL_DAYS": SPOTIFY_MISS_TTL_DAYS,
+        "ART_MEMORY_MB": ART_MEMORY_MB,
+        "ART_DISK_MB": ART_DISK_MB,
+        "SPOTIFY_RATE": SPOTIFY_RATE,
+        "OUTPUT_FORMAT": OUTPUT_FORMAT,
+        "STREAM_ENCODE": int(STREAM_ENCODE),
+        "STAGING_DIR": STAGING_DIR,
+        "STAGING_STALE_HOURS": STAGING_STALE_HOURS,
         "SPOTIFY_CLIENT_ID": os.getenv("SPOTIFY_CLIENT_ID", ""),
         "SPOTIFY_CLIENT_SECRET": os.getenv("SPOTIFY_CLIENT_SECRET", ""),
         "GENIUS_TOKEN": os.getenv("GENIUS_TOKEN", "")
@@ -1199,12 +2885,19 @@ def load_config():
 
 def settings_menu():
     """Settings menu"""
+    global OUTPUT_FORMAT, STREAM_ENCODE, STAGING_DIR
     while True:
         print(f"\n{Fore.CYAN}=== SETTINGS ==={Style.RESET_ALL}")
         print(f"1. Change library path (current: {BASE})")
         print(f"2. Configure Spotify API")
         print(f"3. Configure Genius API")
-        print(f"4. Back")
+        print(f"4. Concurrent downloads (current: {JOBS})")
+        print(f"5. Pipeline stage workers (current: {', '.join(f'{n}={stage_jobs(n)}' for n in PIPELINE_STAGES)})")
+        print(f"6. Output format (current: {'native Opus/M4A' if OUTPUT_FORMAT == 'native' else 'MP3 V0'})")
+        print(f"7. Streaming MP3 encode (current: {'on' if STREAM_ENCODE else 'off'})")
+        print(f"8. Staging folder (current: {staging_root()})")
+        print(f"9. Clear caches")
+        print(f"10. Back")
         
         choice = input(f"{Fore.CYAN}Select: {Style.RESET_ALL}").strip()
         
@@ -1238,6 +2931,52 @@ def settings_menu():
                 print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Updated")
         
         elif choice == "4":
+            jobs = input("Concurrent downloads [1-16]: ").strip()
+            if jobs.isdigit() and 1 <= int(jobs) <= 16:
+                set_jobs(jobs)
+                save_config()
+                print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Updated")
+        
+        elif choice == "5":
+            print(f"\nStages: {', '.join(PIPELINE_STAGES)}")
+            spec = input("Workers (e.g. fetch=6,transcode=4, Enter to reset): ").strip()
+            set_stage_jobs(spec)
+            save_config()
+            print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Updated")
+        
+        elif choice == "6":
+            print("\n1. MP3 V0 (re-encoded, plays everywhere)")
+            print("2. Native Opus/M4A (YouTube's own stream, no re-encode, smaller)")
+            fmt = input("Select: ").strip()
+            if fmt in ("1", "2"):
+                OUTPUT_FORMAT = "mp3" if fmt == "1" else "native"
+                save_config()
+                print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Updated")
+        
+        elif choice == "7":
+            print("\nOn: downloads are piped straight into the MP3 encoder, only the MP3 is written.")
+            print("    Halves disk I/O, but each fetch worker also runs the encoder and the separate")
+            print("    encode workers sit idle. Worth it on slow disks with fetch workers <= CPU cores.")
+            print("Off (default): the source is saved first and encoded on the separate encode workers.")
+            STREAM_ENCODE = not STREAM_ENCODE
+            save_config()
+            print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Streaming encode {'on' if STREAM_ENCODE else 'off'}")
+        
+        elif choice == "8":
+            print("\nDownloads are fetched, encoded and tagged here, then moved into the library.")
+            print("A fast local disk or tmpfs keeps that work off a slow library drive.")
+            path = input("Staging folder (Enter for the library's .reel_staging): ").strip()
+            STAGING_DIR = clean_path(path) if path else ""
+            os.makedirs(staging_root(), exist_ok=True)
+            save_config()
+            print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Updated")
+        
+        elif choice == "9":
+            for cache in CACHES:
+                cache.clear()
+            print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Caches cleared")
+        
+        elif choice == "10":
             break
 
 # =========================== MENU ============================
@@ -1256,10 +2995,11 @@ def menu():
     print(f"{Fore.LIGHTMAGENTA_EX}6.{Fore.WHITE} Spotify Playlist")
     print(f"{Fore.LIGHTMAGENTA_EX}7.{Fore.WHITE} YouTube Playlist")
     print(f"{Fore.LIGHTYELLOW_EX}8.{Fore.WHITE} Settings")
-    print(f"{Fore.RED}9.{Fore.WHITE} Exit\n")
+    print(f"{Fore.RED}9.{Fore.WHITE} Exit")
+    print(f"{Fore.LIGHTYELLOW_EX}R.{Fore.WHITE} Resume Interrupted Batch\n")
     
     try:
-        c = input(f"{Fore.CYAN}Select [1-9]: {Style.RESET_ALL}").strip()
+        c = input(f"{Fore.CYAN}Select [1-9, R]: {Style.RESET_ALL}").strip()
         
         if c == "1":
             track = input("Track: ").strip()
@@ -1277,48 +3017,28 @@ def menu():
                     
                     stderr_buffer = io.StringIO()
                     with contextlib.redirect_stderr(stderr_buffer):
-                        with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True, "logger": yt_logger(), "no_color": True}) as ydl:
-                            print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Extracting info...")
-                            info = ydl.extract_info(url, download=False)
-                            title = info.get("title", "Unknown")
-                            duration = info.get("duration", 0)
-                            uploader = info.get("uploader", "Unknown")
-                            
-                            # Parse track/artist from title
-                            if " - " in title:
-                                parts = title.split(" - ", 1)
-                                artist, track = parts[0].strip(), parts[1].strip()
-                            else:
-                                track, artist = title, "Unknown"
-                            
-                            # Clean up common suffixes
-                            cleanup_patterns = [
-                                "(Official Video)", "(Official Audio)", "(Official Music Video)",
-                                "[Official Video]", "[Official Audio]", "[Official Music Video]",
-                                "(Lyrics)", "[Lyrics]", "(Lyric Video)", "[Lyric Video]",
-                                "(Official Lyric Video)", "[Official Lyric Video]",
-                                "(Audio)", "[Audio]", "(Visualizer)", "[Visualizer]",
-                                "(Official Visualizer)", "[Official Visualizer]",
-                                "(Music Video)", "[Music Video]", "(HD)", "[HD]",
-                                "(4K)", "[4K]", "(Live)", "[Live]"
-                            ]
-                            
-                            for pattern in cleanup_patterns:
-                                track = track.replace(pattern, "").strip()
-                                artist = artist.replace(pattern, "").strip()
-                            
-                            # Show preview
-                            print(f"\n{Fore.CYAN}{'='*60}")
-                            print(f"URL PREVIEW")
-                            print(f"{'='*60}{Style.RESET_ALL}")
-                            print(f"{Fore.GREEN}Track:{Style.RESET_ALL} {track}")
-                            print(f"{Fore.GREEN}Artist:{Style.RESET_ALL} {artist}")
-                            print(f"{Fore.GREEN}Duration:{Style.RESET_ALL} {duration//60}:{duration%60:02d}")
-                            print(f"{Fore.GREEN}Source:{Style.RESET_ALL} {uploader}")
-                            print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
-                            
-                            if input(f"\n{Fore.CYAN}Download this track? [Y/N]: {Style.RESET_ALL}").strip().lower() == "y":
-                                download_url(url)
+                        print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Extracting info...")
+                        info = extract_video(url)
+                        title = info.get("title", "Unknown")
+                        duration = info.get("duration", 0)
+                        uploader = info.get("uploader", "Unknown")
+                        
+                        # Parse track/artist from title, as download_url() will
+                        track, artist = parse_video_title(title)
+                        track = search_title(track)
+                        
+                        # Show preview
+                        print(f"\n{Fore.CYAN}{'='*60}")
+                        print(f"URL PREVIEW")
+                        print(f"{'='*60}{Style.RESET_ALL}")
+                        print(f"{Fore.GREEN}Track:{Style.RESET_ALL} {track}")
+                        print(f"{Fore.GREEN}Artist:{Style.RESET_ALL} {artist}")
+                        print(f"{Fore.GREEN}Duration:{Style.RESET_ALL} {duration//60}:{duration%60:02d}")
+                        print(f"{Fore.GREEN}Source:{Style.RESET_ALL} {uploader}")
+                        print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
+                        
+                        if input(f"\n{Fore.CYAN}Download this track? [Y/N]: {Style.RESET_ALL}").strip().lower() == "y":
+                            download_url(url, info=info)
                 except Exception as e:
                     print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Could not extract info: {e}")
                     print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} Try downloading anyway? [Y/N]")
@@ -1365,6 +3085,9 @@ def menu():
         elif c == "8":
             settings_menu()
         
+        elif c.lower() == "r":
+            resume_menu()
+        
         elif c == "9":
             print(f"\n{Fore.CYAN}[INFO]{Style.RESET_ALL} Exiting... Goodbye!")
             raise SystemExit(0)
@@ -1387,6 +3110,35 @@ if __name__ == "__main__":
     if config:
         if config.get("LIBRARY_PATH"):
             set_dirs(config["LIBRARY_PATH"])
+        if config.get("JOBS"):
+            set_jobs(config["JOBS"])
+        if config.get("STAGE_JOBS"):
+            set_stage_jobs(config["STAGE_JOBS"])
+        if config.get("CACHE_TTL_DAYS", "").isdigit():
+            CACHE_TTL_DAYS = int(config["CACHE_TTL_DAYS"])
+        if config.get("CACHE_MAX_ENTRIES", "").isdigit():
+            CACHE_MAX_ENTRIES = int(config["CACHE_MAX_ENTRIES"])
+        if config.get("YT_CACHE_TTL_DAYS", "").isdigit():
+            YT_CACHE_TTL_DAYS = YT_SEARCH_CACHE.ttl_days = int(config["YT_CACHE_TTL_DAYS"])
+        if config.get("LYRICS_MISS_TTL_DAYS", "").isdigit():
+            LYRICS_MISS_TTL_DAYS = int(config["LYRICS_MISS_TTL_DAYS"])
+        if config.get("SPOTIFY_MISS_TTL_DAYS", "").isdigit():
+            SPOTIFY_MISS_TTL_DAYS = int(config["SPOTIFY_MISS_TTL_DAYS"])
+        if config.get("ART_MEMORY_MB", "").isdigit():
+            ART_MEMORY_MB = int(config["ART_MEMORY_MB"])
+        if config.get("ART_DISK_MB", "").isdigit():
+            ART_DISK_MB = int(config["ART_DISK_MB"])
+        if config.get("SPOTIFY_RATE", "").isdigit() and int(config["SPOTIFY_RATE"]) > 0:
+            SPOTIFY_RATE = int(config["SPOTIFY_RATE"])
+            SPOTIFY_LIMIT.set_rate(SPOTIFY_RATE)
+        if config.get("OUTPUT_FORMAT") in ("mp3", "native"):
+            OUTPUT_FORMAT = config["OUTPUT_FORMAT"]
+        if config.get("STREAM_ENCODE") in ("0", "1"):
+            STREAM_ENCODE = config["STREAM_ENCODE"] == "1"
+        if config.get("STAGING_DIR"):
+            STAGING_DIR = config["STAGING_DIR"]
+        if config.get("STAGING_STALE_HOURS", "").isdigit():
+            STAGING_STALE_HOURS = int(config["STAGING_STALE_HOURS"])
         if config.get("SPOTIFY_CLIENT_ID"):
             os.environ["SPOTIFY_CLIENT_ID"] = config["SPOTIFY_CLIENT_ID"]
             os.environ["SPOTIFY_CLIENT_SECRET"] = config.get("SPOTIFY_CLIENT_SECRET", "")
@@ -1395,6 +3147,23 @@ if __name__ == "__main__":
             os.environ["GENIUS_TOKEN"] = config["GENIUS_TOKEN"]
             genius = init_genius()
     
+    clean_staging()
+    
+    # Command line: --jobs N overrides the saved setting
+    if "--jobs" in sys.argv:
+        idx = sys.argv.index("--jobs")
+        if idx + 1 < len(sys.argv):
+            set_jobs(sys.argv[idx + 1])
+    
+    # Command line: reel.py resume [journal]
+    if "resume" in sys.argv:
+        idx = sys.argv.index("resume")
+        if idx + 1 < len(sys.argv) and not sys.argv[idx + 1].startswith("--"):
+            resume_batch(clean_path(sys.argv[idx + 1]))
+        else:
+            resume_menu()
+        sys.exit(0)
+    
     if not sp:
         print(f"\n{Fore.YELLOW}⚠️  Spotify API not configured!{Style.RESET_ALL}")
         print("Get credentials: https://developer.spotify.com/dashboard")
@@ -0,0 +1,73 @@
+"""Per-track yt-dlp client overhead: a fresh YoutubeDL per call vs reel's ydl_session().
+
+Runs a batch of fake tracks against a local extractor (no network), with
+the same number of extractions per track the old code made (three
+searches and one download), and prints the time per track for both.
+
+    python bench/bench_ydl_reuse.py [--tracks 200] [--calls 4] [--reel "REEL mac-linux"]
+"""
+import argparse, os, sys, time
+
+import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+
+class FakeIE(InfoExtractor):
+    """Answers fake://<id> with a YouTube-like format list, offline"""
+    IE_NAME = "Fake"
+    _VALID_URL = r"fake://(?P<id>\d+)"
+    
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        formats = [
+            {"format_id": "139", "ext": "m4a", "acodec": "mp4a.40.5", "vcodec": "none", "abr": 48},
+            {"format_id": "140", "ext": "m4a", "acodec": "mp4a.40.2", "vcodec": "none", "abr": 129},
+            {"format_id": "249", "ext": "webm", "acodec": "opus", "vcodec": "none", "abr": 53},
+            {"format_id": "251", "ext": "webm", "acodec": "opus", "vcodec": "none", "abr": 135},
+            {"format_id": "18", "ext": "mp4", "acodec": "mp4a.40.2", "vcodec": "avc1.42001E", "tbr": 500},
+        ]
+        for f in formats:
+            f["url"] = f"http://127.0.0.1/{video_id}/{f['format_id']}"
+        return {"id": video_id, "title": f"Track {video_id}", "duration": 200, "formats": formats}
+
+def fresh(reel, url):
+    """Old code path: a new client per call"""
+    with yt_dlp.YoutubeDL(dict(reel.YDL_OPTS, format="bestaudio/best")) as ydl:
+        ydl.add_info_extractor(FakeIE())
+        return ydl.extract_info(url, download=False, ie_key="Fake")
+
+def reused(reel, url):
+    """Current code path: the thread's long-lived client"""
+    with reel.ydl_session(format=reel.select_audio_format) as ydl:
+        if "Fake" not in ydl._ies:
+            ydl.add_info_extractor(FakeIE())
+        return ydl.extract_info(url, download=False, ie_key="Fake")
+
+def run(reel, func, tracks, calls):
+    func(reel, "fake://0")  # Warm-up: imports and extractor class loading, paid once per process either way
+    start = time.perf_counter()
+    for i in range(tracks):
+        for _ in range(calls):
+            info = func(reel, f"fake://{i}")
+            assert info["format_id"], info
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=4, help="extractions per track")
+    parser.add_argument("--reel", default=os.path.join(os.path.dirname(__file__), "..", "REEL mac-linux"),
+                        help="folder with reel.py")
+    args = parser.parse_args()
+    
+    sys.path.insert(0, os.path.abspath(args.reel))
+    import reel
+    
+    before = run(reel, fresh, args.tracks, args.calls)
+    after = run(reel, reused, args.tracks, args.calls)
+    print(f"{args.tracks} tracks x {args.calls} extractions")
+    print(f"  fresh YoutubeDL per call: {before:7.2f}s  ({before / args.tracks * 1000:6.1f} ms/track)")
+    print(f"  ydl_session() reuse:      {after:7.2f}s  ({after / args.tracks * 1000:6.1f} ms/track)")
+    print(f"  saved per track:          {(before - after) / args.tracks * 1000:6.1f} ms ({before / after:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""classify_error() against the error text yt-dlp actually produces.
+
+    python -m unittest discover tests
+"""
+import os, sys, tempfile, unittest
+
+# reel creates its library folders on import; keep them out of the real home
+HOME = tempfile.mkdtemp()
+os.environ["HOME"] = os.environ["USERPROFILE"] = HOME
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "REEL mac-linux"))
+import reel
+
+class ClassifyErrorTest(unittest.TestCase):
+    def check(self, kind, message):
+        # fetch_audio strips the "ERROR: " prefix and keeps the first line
+        self.assertEqual(reel.classify_error(message), kind, message)
+
+    def test_expired_stream_is_retried(self):
+        self.check("transient", "unable to download video data: HTTP Error 404: Not Found")
+        self.check("transient", "unable to download video data: HTTP Error 403: Forbidden")
+        self.check("transient", "fragment 1 not found, unable to continue")
+        self.check("transient", "Giving up after 10 fragment retries")
+
+    def test_throttling(self):
+        self.check("throttled", "unable to download video data: HTTP Error 429: Too Many Requests")
+        self.check("throttled", "[youtube] dQw4w9WgXcQ: Sign in to confirm you're not a bot. Use --cookies-from-browser")
+        self.check("throttled", "[youtube] dQw4w9WgXcQ: This content isn't available, try again later.")
+
+    def test_gone(self):
+        self.check("gone", "[youtube] dQw4w9WgXcQ: Video unavailable")
+        self.check("gone", "[youtube] dQw4w9WgXcQ: Private video. Sign in if you've been granted access to this video")
+        self.check("gone", "[youtube] dQw4w9WgXcQ: Video unavailable. This video has been removed by the uploader")
+
+    def test_restricted(self):
+        self.check("restricted", "[youtube] dQw4w9WgXcQ: The uploader has not made this video available in your country")
+        self.check("restricted", "[youtube] dQw4w9WgXcQ: Sign in to confirm your age. This video may be inappropriate for some users.")
+
+    def test_unsupported(self):
+        self.check("unsupported", "Unsupported URL: https://example.com/page")
+        self.check("unsupported", "[generic] song: Requested format is not available. Use --list-formats for a list of available formats")
+
+    def test_unknown_is_transient(self):
+        self.check("transient", "[youtube] dQw4w9WgXcQ: Unable to download webpage: <urlopen error timed out>")
+
+if __name__ == "__main__":
+    unittest.main()